@@ -116,11 +116,7 @@ function renderSiteFilters() {
   const allPill = document.createElement("button");
   allPill.className = `pill ${state.siteFilter === "" ? "active" : ""}`;
   allPill.textContent = "全部";
-  allPill.onclick = () => {
-    state.siteFilter = "";
-    renderSiteFilters();
-    renderList();
-  };
+  allPill.onclick = () => selectSite("");
   sitePillsEl.appendChild(allPill);
 
   stats.forEach((s) => {
@@ -128,11 +124,7 @@ function renderSiteFilters() {
     btn.className = `pill ${state.siteFilter === s.site_id ? "active" : ""}`;
     const raw = s.raw_count ?? s.count;
     btn.textContent = `${s.site_name} ${s.count}/${raw}`;
-    btn.onclick = () => {
-      state.siteFilter = s.site_id;
-      renderSiteFilters();
-      renderList();
-    };
+    btn.onclick = () => selectSite(s.site_id);
     sitePillsEl.appendChild(btn);
   });
 }
@@ -153,8 +145,19 @@ function renderModeSwitch() {
   }
 }
 
+function collapseClusters(items) {
+  // Items are newest first, so each near-duplicate cluster shows its newest copy.
+  const seen = new Set();
+  return items.filter((item) => {
+    if (!item.cluster_id || (item.cluster_size || 1) <= 1) return true;
+    if (seen.has(item.cluster_id)) return false;
+    seen.add(item.cluster_id);
+    return true;
+  });
+}
+
 function effectiveAllItems() {
-  return state.allDedup ? state.itemsAll : state.itemsAllRaw;
+  return state.allDedup ? collapseClusters(state.itemsAll) : state.itemsAllRaw;
 }
 
 function modeItems() {
@@ -174,7 +177,8 @@ function getFilteredItems() {
 function renderItemNode(item) {
   const node = itemTpl.content.firstElementChild.cloneNode(true);
   node.querySelector(".site").textContent = item.site_name;
-  node.querySelector(".source").textContent = `分区: ${item.source}`;
+  const similar = state.mode === "all" && state.allDedup && item.cluster_size > 1 ? ` · 相似 ${item.cluster_size} 条` : "";
+  node.querySelector(".source").textContent = `分区: ${item.source}${similar}`;
   node.querySelector(".time").textContent = fmtTime(item.published_at || item.first_seen_at);
 
   const titleEl = node.querySelector(".title");
@@ -354,6 +358,245 @@ function renderWaytoagi(waytoagi) {
   });
 }
 
+function expandItem(fields, row) {
+  const item = {};
+  fields.forEach((f, i) => {
+    item[f] = row[i];
+  });
+  const title = String(item.title || "").trim();
+  item.title_original = title;
+  item.title_bilingual = item.title_en && item.title_zh ? `${item.title_zh} / ${title}` : title;
+  return item;
+}
+
+function expandPayload(payload) {
+  // payload_version 2: one item table + per-view row indexes (see update_news.compact_latest_payload).
+  if (payload.payload_version !== 2) return payload;
+  const fields = payload.item_fields || [];
+  const table = (payload.item_table || []).map((row) => expandItem(fields, row));
+  const views = payload.views || {};
+  const pick = (name) => (views[name] || []).map((i) => table[i]);
+  const itemsAi = pick("items_ai");
+  return {
+    ...payload,
+    items: itemsAi,
+    items_ai: itemsAi,
+    items_all_raw: pick("items_all_raw"),
+    items_all: pick("items_all"),
+  };
+}
+
+const SHARD_BASE = "./data/latest-24h";
+const SNAPSHOT_KEY = "ai-news-radar:latest-24h";
+const shards = {
+  manifest: null,
+  rows: [],
+  table: [],
+  views: { items_ai: new Set(), items_all_raw: new Set(), items_all: new Set() },
+  loaded: new Set(),
+  pending: new Map(),
+};
+
+async function fetchJson(url, label) {
+  const res = await fetch(url);
+  if (!res.ok) throw new Error(`加载 ${label} 失败: ${res.status}`);
+  return res.json();
+}
+
+function loadShard(file) {
+  // Shard paths are scoped to their generation (g/<generation>/...), so a file
+  // never changes under a manifest and can be cached as is.
+  if (!shards.pending.has(file)) {
+    const url = `${SHARD_BASE}/${file}`;
+    const p = fetchJson(url, file).then((shard) => {
+      applyShard(shard);
+      shards.loaded.add(file);
+      return shard;
+    });
+    p.catch(() => shards.pending.delete(file));
+    shards.pending.set(file, p);
+  }
+  return shards.pending.get(file);
+}
+
+function applyShard(shard) {
+  const fields = shards.manifest.item_fields || [];
+  (shard.rows || []).forEach((row, i) => {
+    shards.rows[row] = shard.item_table[i];
+    shards.table[row] = expandItem(fields, shard.item_table[i]);
+  });
+  Object.entries(shard.views || {}).forEach(([name, rows]) => {
+    if (!shards.views[name]) shards.views[name] = new Set();
+    rows.forEach((row) => shards.views[name].add(row));
+  });
+  // Row indexes are global and newest-first, so sorting restores the view order.
+  const pick = (name) => Array.from(shards.views[name]).sort((a, b) => a - b).map((row) => shards.table[row]);
+  state.itemsAi = pick("items_ai");
+  state.itemsAllRaw = pick("items_all_raw");
+  state.itemsAll = pick("items_all");
+}
+
+function allPagesLoaded() {
+  return (shards.manifest?.pages || []).every((page) => shards.loaded.has(page.file));
+}
+
+async function loadRemainingPages() {
+  for (const page of shards.manifest.pages.slice(1)) {
+    try {
+      await loadShard(page.file);
+    } catch (err) {
+      console.warn(err);
+      continue;
+    }
+    renderNews();
+  }
+  if (allPagesLoaded()) saveSnapshot(snapshotFromShards());
+}
+
+function readSnapshot() {
+  try {
+    return JSON.parse(localStorage.getItem(SNAPSHOT_KEY) || "null");
+  } catch (err) {
+    return null;
+  }
+}
+
+function saveSnapshot(snapshot) {
+  if (!snapshot || !snapshot.generation) return;
+  try {
+    localStorage.setItem(SNAPSHOT_KEY, JSON.stringify(snapshot));
+  } catch (err) {
+    // Quota exceeded or storage disabled: the next visit just downloads shards again.
+  }
+}
+
+function snapshotFromShards() {
+  const { pages, sites, deltas, page_size, view_totals, ...meta } = shards.manifest;
+  const views = {};
+  Object.entries(shards.views).forEach(([name, rows]) => {
+    views[name] = Array.from(rows).sort((a, b) => a - b);
+  });
+  return { ...meta, item_table: shards.rows, views };
+}
+
+const DELTA_VERSION = 2;
+
+function applyDelta(snapshot, delta) {
+  // Mirrors update_news.apply_latest_delta.
+  if (delta.delta_version !== DELTA_VERSION) throw new Error(`unsupported delta_version: ${delta.delta_version}`);
+  const fields = delta.item_fields || [];
+  const idCol = fields.indexOf("id");
+  const table = [];
+  delta.rows.forEach(([first, count]) => {
+    for (let i = 0; i < count; i += 1) {
+      const r = first >= 0 ? first + i : first - i;
+      if (r < 0) {
+        table.push(delta.added[-r - 1]);
+        continue;
+      }
+      const row = snapshot.item_table[r].slice();
+      Object.entries(delta.changed[row[idCol]] || {}).forEach(([f, v]) => {
+        row[fields.indexOf(f)] = v;
+      });
+      table.push(row);
+    }
+  });
+  const rowOf = new Map(table.map((row, i) => [row[idCol], i]));
+  const views = {};
+  Object.entries(delta.views).forEach(([name, ops]) => {
+    const removed = new Set(ops.remove);
+    const ids = (snapshot.views[name] || [])
+      .map((i) => snapshot.item_table[i][idCol])
+      .filter((id) => !removed.has(id))
+      .concat(ops.add);
+    views[name] = ids.map((id) => rowOf.get(id)).sort((a, b) => a - b);
+  });
+  return { ...delta.meta, item_fields: fields, item_table: table, views };
+}
+
+async function snapshotViaDeltas(manifest) {
+  // A client holding generation N replays N -> ... -> current instead of downloading everything.
+  let snapshot = readSnapshot();
+  if (!snapshot || !snapshot.generation) return null;
+  const steps = new Map((manifest.deltas || []).filter((d) => d.version === DELTA_VERSION).map((d) => [d.from, d]));
+  for (let hops = 0; snapshot.generation !== manifest.generation; hops += 1) {
+    const step = steps.get(snapshot.generation);
+    if (!step || hops > steps.size) return null;
+    snapshot = applyDelta(snapshot, await fetchJson(`${SHARD_BASE}/${step.file}`, step.file));
+  }
+  return snapshot;
+}
+
+function useFullPayload(payload) {
+  const expanded = expandPayload(payload);
+  state.itemsAi = expanded.items_ai || expanded.items || [];
+  state.itemsAllRaw = expanded.items_all_raw || expanded.items_all || expanded.items || [];
+  state.itemsAll = expanded.items_all || expanded.items || [];
+  applyNewsMeta(expanded);
+  renderNews();
+}
+
+async function ensureSiteLoaded(siteId) {
+  if (!siteId || !shards.manifest || allPagesLoaded()) return;
+  const site = (shards.manifest.sites || []).find((s) => s.site_id === siteId);
+  if (!site || shards.loaded.has(site.file)) return;
+  await loadShard(site.file);
+  renderNews();
+}
+
+function selectSite(siteId) {
+  state.siteFilter = siteId;
+  renderSiteFilters();
+  renderList();
+  ensureSiteLoaded(siteId).catch((err) => console.warn(err));
+}
+
+function applyNewsMeta(payload) {
+  state.statsAi = payload.site_stats || [];
+  state.totalAi = payload.total_items || state.itemsAi.length;
+  state.totalRaw = payload.total_items_raw || state.itemsAllRaw.length;
+  state.totalAllMode = payload.total_items_all_mode || state.itemsAll.length;
+  state.generatedAt = payload.generated_at;
+  setStats(payload);
+  updatedAtEl.textContent = `更新时间：${fmtTime(state.generatedAt)}`;
+}
+
+function renderNews() {
+  renderModeSwitch();
+  renderSiteFilters();
+  renderList();
+}
+
+async function loadShardedNews() {
+  let manifest;
+  try {
+    manifest = await fetchJson(`${SHARD_BASE}/manifest.json?t=${Date.now()}`, "manifest.json");
+  } catch (err) {
+    return false;
+  }
+  if (!Array.isArray(manifest.pages) || !manifest.pages.length) return false;
+
+  let snapshot = null;
+  try {
+    snapshot = await snapshotViaDeltas(manifest);
+  } catch (err) {
+    console.warn(err);
+  }
+  if (snapshot) {
+    useFullPayload(snapshot);
+    saveSnapshot(snapshot);
+    return true;
+  }
+
+  shards.manifest = manifest;
+  // Render the newest page right away; the rest stream in behind it.
+  await loadShard(manifest.pages[0].file);
+  applyNewsMeta(manifest);
+  renderNews();
+  loadRemainingPages().catch((err) => console.warn(err));
+  return true;
+}
+
 async function loadNewsData() {
   const res = await fetch(`./data/latest-24h.json?t=${Date.now()}`);
   if (!res.ok) throw new Error(`加载 latest-24h.json 失败: ${res.status}`);
@@ -366,26 +609,26 @@ async function loadWaytoagiData() {
   return res.json();
 }
 
+async function loadFullNews() {
+  const payload = await loadNewsData();
+  if (payload.payload_version === 2) saveSnapshot(payload);
+  useFullPayload(payload);
+}
+
+async function loadNews() {
+  // Fall back to the full snapshot when shards are missing or fail to load.
+  try {
+    if (await loadShardedNews()) return;
+  } catch (err) {
+    console.warn(err);
+  }
+  await loadFullNews();
+}
+
 async function init() {
-  const [newsResult, waytoagiResult] = await Promise.allSettled([loadNewsData(), loadWaytoagiData()]);
-
-  if (newsResult.status === "fulfilled") {
-    const payload = newsResult.value;
-    state.itemsAi = payload.items_ai || payload.items || [];
-    state.itemsAllRaw = payload.items_all_raw || payload.items_all || payload.items || [];
-    state.itemsAll = payload.items_all || payload.items || [];
-    state.statsAi = payload.site_stats || [];
-    state.totalAi = payload.total_items || state.itemsAi.length;
-    state.totalRaw = payload.total_items_raw || state.itemsAllRaw.length;
-    state.totalAllMode = payload.total_items_all_mode || state.itemsAll.length;
-    state.generatedAt = payload.generated_at;
-
-    setStats(payload);
-    renderModeSwitch();
-    renderSiteFilters();
-    renderList();
-    updatedAtEl.textContent = `更新时间：${fmtTime(state.generatedAt)}`;
-  } else {
+  const [newsResult, waytoagiResult] = await Promise.allSettled([loadNews(), loadWaytoagiData()]);
+
+  if (newsResult.status !== "fulfilled") {
     updatedAtEl.textContent = "新闻数据加载失败";
     newsListEl.innerHTML = `<div class="empty">${newsResult.reason.message}</div>`;
   }
@@ -404,11 +647,7 @@ searchInputEl.addEventListener("input", (e) => {
   renderList();
 });
 
-siteSelectEl.addEventListener("change", (e) => {
-  state.siteFilter = e.target.value;
-  renderSiteFilters();
-  renderList();
-});
+siteSelectEl.addEventListener("change", (e) => selectSite(e.target.value));
 
 modeAiBtnEl.addEventListener("click", () => {
   state.mode = "ai";
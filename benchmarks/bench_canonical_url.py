@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""URL canonicalization cost per run: re-normalizing at every stage vs once at ingest.
+
+Before, normalize_url ran on each record in make_item_id, the ingest loop,
+add_bilingual_fields (twice), dedupe and the AI HubToday pass. Now ingest
+stores the canonical URL and host, later stages read them through
+record_url, and raw URLs go through a bounded memo.
+
+    python benchmarks/bench_canonical_url.py --records 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from scripts.update_news import URL_MEMO, canonicalize_url, host_of_url, normalize_url, record_url  # noqa: E402
+
+# Call sites per record that normalized the URL again before ingest stored it.
+STAGES = 6
+
+
+def synthetic_urls(n: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    hosts = [f"news{i}.example.com" for i in range(200)]
+    return [
+        f"https://{rng.choice(hosts).upper()}/posts/{i}?id={i}&utm_source=feed&ref=home#top"
+        for i in range(n)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        URL_MEMO.clear()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    urls = synthetic_urls(args.records, 7)
+
+    def before() -> None:
+        for url in urls:
+            for _ in range(STAGES):
+                canonicalize_url(url)
+
+    def after() -> None:
+        records = []
+        for url in urls:
+            canonical = normalize_url(url)
+            normalize_url(canonical)  # make_item_id on the canonical URL: a memo hit
+            records.append({"url": canonical, "host": host_of_url(canonical)})
+        for record in records:
+            for _ in range(STAGES - 2):
+                record_url(record)
+
+    before_ms = timed(before, args.repeat)
+    after_ms = timed(after, args.repeat)
+    print(f"records={args.records} stages={STAGES}")
+    print(f"normalize at every stage: {before_ms:9.1f} ms")
+    print(f"canonical once at ingest: {after_ms:9.1f} ms  ({before_ms / after_ms:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Window selection and per-site counts: record dict loops vs the NumPy columnar snapshot.
+
+    python benchmarks/bench_columnar_queries.py --records 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from scripts.update_news import (  # noqa: E402
+    build_columnar_snapshot,
+    columnar_site_counts,
+    columnar_window_mask,
+    load_columnar_snapshot,
+    np,
+    write_columnar_snapshot,
+)
+
+NOW = datetime(2026, 2, 20, 12, 0, tzinfo=timezone.utc)
+SITES = ("techurls", "buzzing", "tophub", "newsnow", "aibase", "opmlrss")
+
+
+def synthetic_records(n: int) -> list[dict]:
+    base = NOW.timestamp()
+    out = []
+    for i in range(n):
+        ts = base - (i * 7919 % (45 * 86400))
+        out.append(
+            {
+                "id": f"{i:040x}",
+                "site_id": SITES[i % len(SITES)],
+                "site_name": SITES[i % len(SITES)].title(),
+                "source": f"source-{i % 50}",
+                "title": f"OpenAI ships agent toolkit update number {i}",
+                "url": f"https://example.com/posts/{i}",
+                "published_ts": ts,
+                "first_seen_ts": ts,
+                "last_seen_ts": ts,
+                "event_ts": ts,
+            }
+        )
+    return out
+
+
+def loop_query(records: list[dict], start_ts: float) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for record in records:
+        ts = record["event_ts"]
+        if ts is not None and ts >= start_ts:
+            counts[record["site_id"]] = counts.get(record["site_id"], 0) + 1
+    return counts
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+    if np is None:
+        print("numpy is not installed")
+        return 1
+
+    records = synthetic_records(args.records)
+    start_ts = (NOW - timedelta(hours=24)).timestamp()
+    with TemporaryDirectory() as td:
+        write_columnar_snapshot(Path(td), build_columnar_snapshot(records), NOW)
+        open_ms = timed(lambda: load_columnar_snapshot(Path(td)), args.repeat)
+        snap = load_columnar_snapshot(Path(td))
+        expected = loop_query(records, start_ts)
+        assert columnar_site_counts(snap, columnar_window_mask(snap, start_ts)) == expected
+
+        loop_ms = timed(lambda: loop_query(records, start_ts), args.repeat)
+        vec_ms = timed(lambda: columnar_site_counts(snap, columnar_window_mask(snap, start_ts)), args.repeat)
+        del snap
+
+    print(f"records={args.records} in_window={sum(expected.values())}")
+    print(f"open snapshot (mmap): {open_ms:8.2f} ms")
+    print(f"dict loop:            {loop_ms:8.2f} ms")
+    print(f"columnar:             {vec_ms:8.2f} ms  ({loop_ms / vec_ms:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
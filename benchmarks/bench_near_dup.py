@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Near-duplicate clustering time vs item count (MinHash + LSH band buckets).
+
+Each synthetic story is posted by 1-4 sources with small title edits, so the
+expected cluster count is known.
+
+    python benchmarks/bench_near_dup.py --sizes 10000,50000,100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from scripts.update_news import cluster_near_duplicates  # noqa: E402
+
+COMMON = (
+    "openai anthropic nvidia google meta apple model agent chip robot launch funding release "
+    "benchmark open source inference training 大模型 芯片 机器人 发布 融资 开源 推理 训练 智能体 算力"
+).split()
+
+
+def vocabulary(rng: random.Random, size: int) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def synthetic_items(n: int, seed: int) -> tuple[list[dict], int]:
+    rng = random.Random(seed)
+    words = vocabulary(rng, 20000)
+    items: list[dict] = []
+    stories = 0
+    while len(items) < n:
+        stories += 1
+        base = " ".join(rng.choice(COMMON if rng.random() < 0.3 else words) for _ in range(rng.randint(6, 12)))
+        for copy in range(rng.randint(1, 4)):
+            title = base
+            if copy == 1:
+                title = base + "!"
+            elif copy == 2:
+                title = base.title()
+            elif copy == 3:
+                title = "Breaking: " + base
+            items.append({"id": f"{len(items):08d}", "title": title, "published_at": None})
+    return items[:n], stories
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,50000,100000")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'stories':>8} {'clusters':>9} {'seconds':>8} {'us/item':>8}")
+    for n in [int(x) for x in args.sizes.split(",") if x.strip()]:
+        items, stories = synthetic_items(n, args.seed)
+        start = time.perf_counter()
+        clusters = cluster_near_duplicates(items)
+        elapsed = time.perf_counter() - start
+        print(f"{n:>8} {stories:>8} {len(set(clusters.values())):>9} {elapsed:>8.2f} {elapsed / n * 1e6:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
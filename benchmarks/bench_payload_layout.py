@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Size and decode time of latest-24h.json: v1 (full lists) vs v2 (item table + indexes).
+
+    python benchmarks/bench_payload_layout.py --items 3000
+    python benchmarks/bench_payload_layout.py --input data/latest-24h.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from scripts.update_news import compact_latest_payload, expand_latest_payload  # noqa: E402
+
+
+def synthetic_v1(n: int) -> dict:
+    items = []
+    for i in range(n):
+        title = f"OpenAI ships agent toolkit update number {i}" if i % 3 else f"大模型推理加速方案 {i}"
+        en = title if i % 3 else None
+        zh = f"OpenAI 发布智能体工具包更新 {i}" if i % 3 and i % 2 else (None if i % 3 else title)
+        items.append(
+            {
+                "id": f"{i:040x}",
+                "site_id": ("techurls", "buzzing", "tophub", "newsnow")[i % 4],
+                "site_name": ("TechURLs", "Buzzing", "TopHub", "NewsNow")[i % 4],
+                "source": ("Hacker News", "news.ycombinator.com", "36氪", "technology")[i % 4],
+                "title": title,
+                "url": f"https://example.com/posts/{i}",
+                "published_at": "2026-02-20T01:00:00Z",
+                "first_seen_at": "2026-02-20T01:30:00Z",
+                "last_seen_at": "2026-02-20T02:00:00Z",
+                "title_original": title,
+                "title_en": en,
+                "title_zh": zh,
+                "title_bilingual": f"{zh} / {title}" if en and zh else title,
+            }
+        )
+    ai = items[: n // 2]
+    return {"generated_at": "2026-02-20T02:00:00Z", "items": ai, "items_ai": ai, "items_all_raw": items, "items_all": items[: n * 4 // 5]}
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=3000, help="Synthetic items in items_all_raw")
+    parser.add_argument("--input", default="", help="Existing latest-24h.json (either version) instead of synthetic data")
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.input:
+        v1 = expand_latest_payload(json.loads(Path(args.input).read_text(encoding="utf-8")))
+    else:
+        v1 = synthetic_v1(args.items)
+    meta = {k: v for k, v in v1.items() if not k.startswith("items")}
+    v2 = compact_latest_payload(meta, v1["items_ai"], v1["items_all_raw"], v1["items_all"])
+
+    print(f"items_all_raw={len(v1['items_all_raw'])} items_ai={len(v1['items_ai'])} items_all={len(v1['items_all'])}")
+    print(f"{'layout':>7} {'bytes':>11} {'gzip':>10} {'loads ms':>9} {'expand ms':>10}")
+    for name, payload in (("v1", v1), ("v2", v2)):
+        text = json.dumps(payload, ensure_ascii=False, indent=2)
+        raw = text.encode("utf-8")
+        loads_ms = timed(lambda: json.loads(text), args.repeat)
+        expand_ms = timed(lambda: expand_latest_payload(json.loads(text)), args.repeat) - loads_ms if name == "v2" else 0.0
+        print(f"{name:>7} {len(raw):>11,} {len(gzip.compress(raw)):>10,} {loads_ms:>9.1f} {expand_ms:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Peak RSS of the archive record model: plain dicts vs slotted ArchiveRecord.
+
+Each (mode, size) runs in a fresh interpreter so ru_maxrss is not shared:
+
+    python benchmarks/bench_record_memory.py --sizes 10000,100000,1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+SITES = [
+    ("techurls", "TechURLs", "Hacker News"),
+    ("buzzing", "Buzzing", "news.ycombinator.com"),
+    ("tophub", "TopHub", "36氪 · 24小时热榜"),
+    ("newsnow", "NewsNow", "technology"),
+    ("opmlrss", "OPML RSS", "Simon Willison's Weblog"),
+]
+
+
+def synthetic_lines(n: int):
+    # Serialized like an archive partition, so every string is a fresh object after json.loads.
+    for i in range(n):
+        site_id, site_name, source = SITES[i % len(SITES)]
+        yield json.dumps(
+            {
+                "id": f"{i:040x}",
+                "site_id": site_id,
+                "site_name": site_name,
+                "source": source,
+                "title": f"OpenAI ships agent toolkit update number {i}",
+                "url": f"https://example.com/posts/{i}",
+                "published_at": "2026-02-20T01:00:00Z",
+                "first_seen_at": "2026-02-20T01:30:00Z",
+                "last_seen_at": "2026-02-20T02:00:00Z",
+                "published_ts": 1771549200.0 + i,
+                "first_seen_ts": 1771551000.0 + i,
+                "last_seen_ts": 1771552800.0 + i,
+                "event_ts": 1771549200.0 + i,
+            },
+            ensure_ascii=False,
+        )
+
+
+def enrich_fields(item) -> dict:
+    title = str(item.get("title") or "")
+    return {"title_original": title, "title_en": title, "title_zh": None, "title_bilingual": title}
+
+
+def run_child(mode: str, size: int, window_fraction: float) -> dict:
+    from scripts.update_news import ArchiveRecord, RecordView
+
+    base_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    window_every = max(1, round(1 / window_fraction)) if window_fraction > 0 else 0
+
+    archive = {}
+    for line in synthetic_lines(size):
+        data = json.loads(line)
+        archive[data["id"]] = data if mode == "dict" else ArchiveRecord.from_dict(data)
+
+    window = []
+    for i, record in enumerate(archive.values()):
+        if not window_every or i % window_every:
+            continue
+        if mode == "dict":
+            normalized = dict(record)
+            normalized["source"] = str(normalized["source"]).strip()
+            out = dict(normalized)
+            out.update(enrich_fields(out))
+        else:
+            out = RecordView(RecordView(record, {}), enrich_fields(record))
+        window.append(out)
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"mode": mode, "size": size, "window": len(window), "base_mb": base_kb / 1024, "peak_mb": peak_kb / 1024}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--window-fraction", type=float, default=0.1, help="Share of records copied into the window")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child[0], int(args.child[1]), args.window_fraction)))
+        return 0
+
+    print(f"{'size':>9} {'mode':>6} {'window':>8} {'peak MB':>9} {'net MB':>9}")
+    for size in [int(x) for x in args.sizes.split(",") if x.strip()]:
+        rows = {}
+        for mode in ("dict", "slots"):
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", mode, str(size), "--window-fraction", str(args.window_fraction)],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            row = rows[mode] = json.loads(proc.stdout)
+            net = row["peak_mb"] - row["base_mb"]
+            print(f"{size:>9} {mode:>6} {row['window']:>8} {row['peak_mb']:>9.1f} {net:>9.1f}")
+        saved = 1 - (rows["slots"]["peak_mb"] - rows["slots"]["base_mb"]) / max(rows["dict"]["peak_mb"] - rows["dict"]["base_mb"], 1e-9)
+        print(f"{size:>9} {'':>6} {'':>8} {'saved':>9} {saved:>8.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
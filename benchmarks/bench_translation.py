@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Title translation wall time: one request per title vs concurrent batches.
+
+Runs against the local stub endpoint with a fixed per-request latency, so the
+numbers reflect request count and overlap rather than the real service.
+
+    python benchmarks/bench_translation.py --titles 80 --latency 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from scripts.translation import TRANSLATE_MAX_RPS, TRANSLATE_WORKERS, translate_titles, translate_to_zh_cn  # noqa: E402
+from tests.stub_translate_server import StubTranslateServer  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=80)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=TRANSLATE_WORKERS)
+    parser.add_argument("--rps", type=float, default=TRANSLATE_MAX_RPS)
+    args = parser.parse_args()
+
+    titles = [f"OpenAI ships agent toolkit update number {i} for enterprise developers" for i in range(args.titles)]
+    with StubTranslateServer(latency=args.latency) as stub, requests.Session() as session:
+        start = time.perf_counter()
+        single = {t: translate_to_zh_cn(session, t, stub.endpoint) for t in titles}
+        single_s = time.perf_counter() - start
+        single_requests = len(stub.requests)
+
+        stub.requests.clear()
+        start = time.perf_counter()
+        batched = translate_titles(session, titles, workers=args.workers, endpoint=stub.endpoint, rate=args.rps)
+        batched_s = time.perf_counter() - start
+        batched_requests = len(stub.requests)
+
+    assert batched == single
+    print(f"titles={args.titles} latency={args.latency * 1000:.0f} ms workers={args.workers} rps={args.rps}")
+    print(f"one per title:       {single_s:7.2f} s  {single_requests:4d} requests")
+    print(f"concurrent batches:  {batched_s:7.2f} s  {batched_requests:4d} requests  ({single_s / batched_s:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
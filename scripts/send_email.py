@@ -8,15 +8,24 @@ AI News Radar — 每日邮件发送系统 v3
 """
 
 from __future__ import annotations
-import json, os, re, smtplib, ssl, sys, time
+import json, os, queue, re, smtplib, ssl, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from datetime import datetime, timezone, timedelta
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 import xml.etree.ElementTree as ET
 import urllib.request, urllib.error
 
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from scripts import translation
+except ModuleNotFoundError:
+    import translation
+
 # ── 配置 ──────────────────────────────────────────────────────────────────────
 
 # 经过严格筛选的 AI 专家列表
@@ -44,6 +53,11 @@ YOUTUBE_CHANNELS = [
     {"name": "Yannic Kilcher",     "channel_id": "UCZHmQk67mSJgfCCTn7xBfew",  "desc": "ML论文深度解析"},
 ]
 
+YOUTUBE_FEED_URL = "https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+
+# YouTube feed 的 ETag/Last-Modified 与上次解析结果，保存在 DATA_DIR 下
+YOUTUBE_FEED_CACHE_FILE = "youtube-feeds.json"
+
 # RSSHub 镜像（Twitter RSS源，多个备用）
 RSSHUB_MIRRORS = [
     "https://rsshub.rssforever.com",
@@ -51,8 +65,29 @@ RSSHUB_MIRRORS = [
     "https://rsshub.app",
 ]
 
+NITTER_BASE = "https://nitter.net"
+
+# Twitter 部分的总时限（秒）：超时未返回的专家按抓取失败处理
+TWITTER_DEADLINE = 45
+
 DATA_DIR = Path(os.environ.get("DATA_DIR", "data"))
 
+# 新闻候选条数与每封邮件默认条数（订阅者可用 max_items 覆盖）
+NEWS_POOL_SIZE = 200
+NEWS_PER_EMAIL = 20
+
+# 并发投递使用的常驻 SMTP 连接数
+SMTP_POOL_SIZE = int(os.environ.get("SMTP_POOL_SIZE", "3"))
+# auto: 先 STARTTLS，失败再 SSL:465；也可指定 starttls / ssl / none（本地测试用）
+SMTP_SECURITY_MODES = ("auto", "starttls", "ssl", "none")
+
+# 镜像健康度（成功率、延迟的指数滑动平均）记录在 DATA_DIR/mirror-health.json
+MIRROR_HEALTH_FILE = "mirror-health.json"
+MIRROR_HEALTH_ALPHA = 0.2          # 滑动平均中新样本的权重
+MIRROR_STAGGER = 1.0               # 竞速时按健康度排序，相邻镜像错开启动的秒数
+MIRROR_FAILURE_LIMIT = 3           # 连续失败的运行次数达到后进入冷却
+MIRROR_COOLDOWN = 6 * 3600         # 冷却时长（秒），期间不再尝试该镜像
+
 # ── 工具函数 ───────────────────────────────────────────────────────────────────
 
 def clean_html(text: str, max_len: int = 300) -> str:
@@ -81,44 +116,45 @@ def fetch_url(url: str, timeout: int = 10) -> Optional[str]:
         return None
 
 
-def translate_to_zh(text: str) -> str:
+def write_json_atomic(path: Path, data) -> None:
+    """以 JSON 写入状态文件（经共享模块原子替换，避免中途失败留下半截文件）"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    translation.atomic_write_bytes(path, json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8"))
+
+
+_title_cache: Optional[translation.TitleCache] = None
+_translate_session: Optional[requests.Session] = None
+
+
+def translator() -> tuple[translation.TitleCache, requests.Session]:
+    """懒加载与 update_news.py 共用的翻译缓存（data/title-zh-cache/）和 HTTP 会话"""
+    global _title_cache, _translate_session
+    if _title_cache is None:
+        today = datetime.now(timezone.utc).date().isoformat()
+        _title_cache = translation.open_title_cache(
+            DATA_DIR / "title-zh-cache", today, DATA_DIR / "title-zh-cache.json"
+        )
+        _translate_session = requests.Session()
+    return _title_cache, _translate_session
+
+
+def translate_many(texts: list[str]) -> dict[str, str]:
     """
-    英文→中文翻译，使用 Google Translate 免费接口（无需 API key）
-    如果已是中文则直接返回；翻译失败则返回原文
+    批量英文→中文翻译：先查共享缓存，未命中的经共享模块分批、并发请求
+    返回 原文 → 译文；已是中文或翻译失败的返回原文
     """
-    if not text:
-        return ""
-    # 如果已有中文（超过20%是CJK字符），直接返回
-    cjk = len(re.findall(r"[\u4e00-\u9fff]", text))
-    if cjk / max(len(text), 1) > 0.2:
-        return text
+    todo = [text[:500] for text in texts if translation.needs_translation(text)]  # 限制长度避免请求过大
+    if not todo:
+        return {text: text for text in texts}
+    cache, session = translator()
+    zh = translation.translate_cached(session, todo, cache)
+    return {text: (zh.get(text[:500]) or text) if translation.needs_translation(text) else text for text in texts}
 
-    try:
-        import urllib.parse
-        # Google Translate 非官方接口，无需 key
-        encoded = urllib.parse.quote(text[:500])  # 限制长度避免请求过大
-        url = f"https://translate.googleapis.com/translate_a/single?client=gtx&sl=en&tl=zh-CN&dt=t&q={encoded}"
-        req = urllib.request.Request(url, headers={
-            "User-Agent": "Mozilla/5.0",
-            "Accept": "application/json"
-        })
-        with urllib.request.urlopen(req, timeout=8) as resp:
-            import json as _json
-            data = _json.loads(resp.read().decode("utf-8"))
-            # 结果格式: [[["译文","原文",...], ...], ...]
-            parts = []
-            for segment in (data[0] or []):
-                if segment and segment[0]:
-                    parts.append(str(segment[0]))
-            result = "".join(parts).strip()
-            return result if result else text
-    except Exception:
-        return text  # 翻译失败静默返回原文
 
 # ── 抓取专家 Twitter 动态 ─────────────────────────────────────────────────────
 
 def parse_rss_items(xml_text: str, expert_name: str, expert_role: str) -> list[dict]:
-    """解析RSS XML，提取条目"""
+    """解析RSS XML，提取条目（content_zh 留空，选定入选条目后再批量翻译）"""
     items = []
     try:
         root = ET.fromstring(xml_text)
@@ -139,7 +175,7 @@ def parse_rss_items(xml_text: str, expert_name: str, expert_role: str) -> list[d
                 "expert_name": expert_name,
                 "expert_role": expert_role,
                 "content":     content,
-                "content_zh":  translate_to_zh(content),
+                "content_zh":  None,
                 "url":         link,
                 "published":   pub,
                 "type":        "twitter",
@@ -162,7 +198,7 @@ def parse_rss_items(xml_text: str, expert_name: str, expert_role: str) -> list[d
                     "expert_name": expert_name,
                     "expert_role": expert_role,
                     "content":     content,
-                    "content_zh":  translate_to_zh(content),
+                    "content_zh":  None,
                     "url":         link,
                     "published":   pub,
                     "type":        "twitter",
@@ -173,112 +209,282 @@ def parse_rss_items(xml_text: str, expert_name: str, expert_role: str) -> list[d
     return items
 
 
+_health_lock = threading.Lock()
+
+
+def load_mirror_health(path: Path) -> dict:
+    """读取镜像健康状态：{镜像: {success, latency_ms, failures, cooldown_until}}"""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {k: v for k, v in data.items() if isinstance(v, dict)} if isinstance(data, dict) else {}
+
+
+def record_mirror_run(health: dict, mirror: str, samples: list[tuple[bool, float]], now: float) -> None:
+    """
+    把本次运行中对某镜像的全部请求 [(是否成功, 耗时秒)] 汇总为一个样本：
+    成功率与平均延迟计入滑动平均；请求全部失败才算一次失败的运行，
+    连续 MIRROR_FAILURE_LIMIT 次失败的运行后进入冷却
+    """
+    if not samples:
+        return
+    ok_seconds = [seconds for ok, seconds in samples if ok]
+    rate = len(ok_seconds) / len(samples)
+    state = health.setdefault(mirror, {"success": 0.5, "latency_ms": None, "failures": 0, "cooldown_until": 0})
+    state["success"] = round((1 - MIRROR_HEALTH_ALPHA) * state["success"] + MIRROR_HEALTH_ALPHA * rate, 4)
+    if ok_seconds:
+        ms = sum(ok_seconds) / len(ok_seconds) * 1000
+        prev = state["latency_ms"]
+        state["latency_ms"] = round(ms if prev is None else (1 - MIRROR_HEALTH_ALPHA) * prev + MIRROR_HEALTH_ALPHA * ms)
+        state["failures"] = 0
+    else:
+        state["failures"] += 1
+        if state["failures"] >= MIRROR_FAILURE_LIMIT:
+            state["cooldown_until"] = now + MIRROR_COOLDOWN
+
+
+def rank_mirrors(health: dict, mirrors: list[str], now: float) -> list[str]:
+    """按成功率从高到低、延迟从低到高排序，跳过冷却中的镜像（全部冷却时仍全部尝试）"""
+    def key(mirror: str) -> tuple:
+        state = health.get(mirror) or {}
+        latency = state.get("latency_ms")
+        return (-state.get("success", 0.5), latency if latency is not None else float("inf"))
+
+    ranked = sorted(mirrors, key=key)
+    available = [m for m in ranked if (health.get(m) or {}).get("cooldown_until", 0) <= now]
+    return available or ranked
+
+
+def race_mirrors(urls: list[str], timeout: int = 8) -> Iterator[tuple[str, Optional[str], float]]:
+    """
+    并发请求镜像，按完成先后产出 (url, xml, 耗时)；连接失败、HTTP 错误或返回的不是 RSS/Atom 时 xml 为 None。
+    urls 按优先级排列，第 i 个延后 i * MIRROR_STAGGER 秒启动；调用方停止迭代后，
+    尚未启动的请求取消，进行中的请求结果作废
+    """
+    stop = threading.Event()
+
+    def attempt(delay: float, url: str) -> tuple[Optional[str], float]:
+        if stop.wait(delay):
+            return None, 0.0
+        start = time.perf_counter()
+        xml = fetch_url(url, timeout)
+        return (xml if xml and ("<rss" in xml or "<feed" in xml) else None), time.perf_counter() - start
+
+    pool = ThreadPoolExecutor(max_workers=len(urls))
+    futures = {pool.submit(attempt, i * MIRROR_STAGGER, url): url for i, url in enumerate(urls)}
+    try:
+        for future in as_completed(futures):
+            if stop.is_set():
+                break
+            xml, seconds = future.result()
+            yield futures[future], xml, seconds
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_expert(expert: dict, health: Optional[dict] = None,
+                 samples: Optional[dict] = None) -> tuple[list[dict], Optional[str]]:
+    """
+    抓取单个专家：按健康度排序的 RSSHub 镜像竞速，先解析出条目的胜出；全部失败再试 Nitter。
+    每个完成的请求以 (是否成功, 耗时) 追加到 samples[镜像]；某个账号的 feed 为空不算镜像失败
+    """
+    handle = expert["handle"]
+    health = {} if health is None else health
+    samples = {} if samples is None else samples
+    ranked = rank_mirrors(health, RSSHUB_MIRRORS, time.time())
+    mirrors = {f"{mirror}/twitter/user/{handle}": mirror for mirror in ranked}
+    race = race_mirrors(list(mirrors), timeout=8)
+    try:
+        for url, xml, seconds in race:
+            with _health_lock:
+                samples.setdefault(mirrors[url], []).append((xml is not None, seconds))
+            items = parse_rss_items(xml, expert["name"], expert["role"]) if xml else []
+            if items:
+                return items, mirrors[url]
+    finally:
+        race.close()
+
+    # 尝试 Nitter（备用）
+    xml = fetch_url(f"{NITTER_BASE}/{handle}/rss", timeout=8)
+    if xml and ("<item>" in xml or "<entry>" in xml):
+        items = parse_rss_items(xml, expert["name"], expert["role"])
+        if items:
+            return items, "Nitter"
+    return [], None
+
+
 def fetch_twitter_experts() -> list[dict]:
-    """抓取所有 Twitter 专家的最新动态"""
+    """并发抓取所有 Twitter 专家的最新动态，输出顺序与专家列表一致"""
     results = []
     print(f"🐦 抓取 Twitter 专家动态 ({len(TWITTER_EXPERTS)} 位)...")
 
-    for expert in TWITTER_EXPERTS:
-        handle = expert["handle"]
-        name   = expert["name"]
-        role   = expert["role"]
-        fetched = False
-
-        # 依次尝试各 RSSHub 镜像
-        for mirror in RSSHUB_MIRRORS:
-            url = f"{mirror}/twitter/user/{handle}"
-            xml = fetch_url(url, timeout=8)
-            if xml and ("<item>" in xml or "<entry>" in xml):
-                items = parse_rss_items(xml, name, role)
-                if items:
-                    results.extend(items[:2])  # 每人最多取2条
-                    print(f"  ✅ {name}: {len(items)} 条 (via {mirror})")
-                    fetched = True
-                    break
-            time.sleep(0.3)
-
-        if not fetched:
-            # 尝试 Nitter（备用）
-            nitter_url = f"https://nitter.net/{handle}/rss"
-            xml = fetch_url(nitter_url, timeout=8)
-            if xml and ("<item>" in xml or "<entry>" in xml):
-                items = parse_rss_items(xml, name, role)
-                if items:
-                    results.extend(items[:2])
-                    print(f"  ✅ {name}: {len(items)} 条 (via Nitter)")
-                    fetched = True
-
-        if not fetched:
-            print(f"  ⚠️ {name} (@{handle}): 无法抓取")
+    health_path = DATA_DIR / MIRROR_HEALTH_FILE
+    health = load_mirror_health(health_path)
+    samples: dict[str, list[tuple[bool, float]]] = {}
+    pool = ThreadPoolExecutor(max_workers=len(TWITTER_EXPERTS))
+    futures = [pool.submit(fetch_expert, expert, health, samples) for expert in TWITTER_EXPERTS]
+    done, _ = wait(futures, timeout=TWITTER_DEADLINE)
+    pool.shutdown(wait=False, cancel_futures=True)
+    # 每个镜像每次运行只记一个汇总样本，失败次数按运行累计
+    with _health_lock:
+        run = {mirror: list(outcomes) for mirror, outcomes in samples.items()}
+    now = time.time()
+    for mirror, outcomes in run.items():
+        record_mirror_run(health, mirror, outcomes, now)
+    write_json_atomic(health_path, health)
+
+    for expert, future in zip(TWITTER_EXPERTS, futures):
+        items, via = future.result() if future in done and future.exception() is None else ([], None)
+        if items:
+            results.extend(items[:2])  # 每人最多取2条
+            print(f"  ✅ {expert['name']}: {len(items)} 条 (via {via})")
+        else:
+            print(f"  ⚠️ {expert['name']} (@{expert['handle']}): 无法抓取")
+
+    # 只翻译最终入选邮件的条目，一次批量、并发完成
+    zh = translate_many([item["content"] for item in results])
+    for item in results:
+        item["content_zh"] = zh[item["content"]]
 
     print(f"  共获取 Twitter 动态: {len(results)} 条")
     return results
 
 
+def parse_youtube_feed(xml_text: str, ch: dict) -> list[dict]:
+    """解析频道 Atom feed，取最新 2 个视频（title_zh 留空，统一在抓取完成后批量翻译）"""
+    items = []
+    try:
+        root = ET.fromstring(xml_text)
+        ns = {
+            "atom":  "http://www.w3.org/2005/Atom",
+            "media": "http://search.yahoo.com/mrss/",
+            "yt":    "http://www.youtube.com/xml/schemas/2015",
+        }
+        for entry in root.findall("atom:entry", ns)[:2]:
+            title    = (entry.findtext("atom:title", "", ns) or "").strip()
+            link_el  = entry.find("atom:link", ns)
+            link     = link_el.get("href", "") if link_el is not None else ""
+            pub      = (entry.findtext("atom:published", "", ns) or "").strip()
+            desc_el  = entry.find(".//media:description", ns)
+            desc     = clean_html(desc_el.text or "" if desc_el is not None else "", 200)
+
+            if not title:
+                continue
+            items.append({
+                "channel_name": ch["name"],
+                "channel_desc": ch["desc"],
+                "title":        title,
+                "title_zh":     None,
+                "summary":      desc,
+                "url":          link,
+                "published":    pub,
+                "type":         "youtube",
+            })
+    except ET.ParseError:
+        pass
+    return items
+
+
+def fetch_youtube_channel(session: requests.Session, ch: dict, cached: Optional[dict]) -> tuple[Optional[dict], str]:
+    """
+    条件请求单个频道（If-None-Match / If-Modified-Since）
+    返回 (缓存条目 {etag, last_modified, items}, 状态)；状态为 fresh / unchanged / failed / invalid
+    """
+    url = YOUTUBE_FEED_URL.format(channel_id=ch["channel_id"])
+    headers = {}
+    if cached and cached.get("items"):
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    try:
+        resp = session.get(url, headers=headers, timeout=10)
+    except requests.RequestException:
+        return None, "failed"
+    if resp.status_code == 304 and headers:
+        return cached, "unchanged"
+    if resp.status_code != 200:
+        return None, "failed"
+    items = parse_youtube_feed(resp.text, ch)
+    if not items:
+        return None, "invalid"
+    entry = {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified"), "items": items}
+    return entry, "fresh"
+
+
 def fetch_youtube_channels() -> list[dict]:
-    """抓取所有 YouTube 频道的最新视频"""
+    """并发抓取所有 YouTube 频道的最新视频；未变化的 feed 复用上次解析（含译文）的结果"""
     results = []
     print(f"▶  抓取 YouTube 频道 ({len(YOUTUBE_CHANNELS)} 个)...")
 
-    for ch in YOUTUBE_CHANNELS:
-        url = f"https://www.youtube.com/feeds/videos.xml?channel_id={ch['channel_id']}"
-        xml = fetch_url(url, timeout=10)
-        if not xml:
+    cache_path = DATA_DIR / YOUTUBE_FEED_CACHE_FILE
+    try:
+        feed_cache = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        feed_cache = {}
+    if not isinstance(feed_cache, dict):
+        feed_cache = {}
+
+    # 共用一个连接池，频道数即并发数
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=len(YOUTUBE_CHANNELS))
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = "Mozilla/5.0 (AI News Radar RSS Reader)"
+    with ThreadPoolExecutor(max_workers=len(YOUTUBE_CHANNELS)) as pool:
+        fetched = list(pool.map(
+            lambda ch: fetch_youtube_channel(session, ch, feed_cache.get(ch["channel_id"])),
+            YOUTUBE_CHANNELS,
+        ))
+    session.close()
+
+    for ch, (entry, status) in zip(YOUTUBE_CHANNELS, fetched):
+        if status == "failed":
             print(f"  ⚠️ {ch['name']}: 无法抓取")
-            continue
-
-        items = []
-        try:
-            root = ET.fromstring(xml)
-            ns = {
-                "atom":  "http://www.w3.org/2005/Atom",
-                "media": "http://search.yahoo.com/mrss/",
-                "yt":    "http://www.youtube.com/xml/schemas/2015",
-            }
-            for entry in root.findall("atom:entry", ns)[:2]:
-                title    = (entry.findtext("atom:title", "", ns) or "").strip()
-                link_el  = entry.find("atom:link", ns)
-                link     = link_el.get("href", "") if link_el is not None else ""
-                pub      = (entry.findtext("atom:published", "", ns) or "").strip()
-                desc_el  = entry.find(".//media:description", ns)
-                desc     = clean_html(desc_el.text or "" if desc_el is not None else "", 200)
-
-                if not title:
-                    continue
-                items.append({
-                    "channel_name": ch["name"],
-                    "channel_desc": ch["desc"],
-                    "title":        title,
-                    "title_zh":     translate_to_zh(title),
-                    "summary":      desc,
-                    "url":          link,
-                    "published":    pub,
-                    "type":         "youtube",
-                })
-        except ET.ParseError:
-            pass
-
-        if items:
-            results.extend(items)
-            print(f"  ✅ {ch['name']}: {len(items)} 条")
-        else:
+        elif status == "invalid":
             print(f"  ⚠️ {ch['name']}: 解析失败")
+        else:
+            feed_cache[ch["channel_id"]] = entry
+            results.extend(entry["items"])
+            print(f"  ✅ {ch['name']}: {len(entry['items'])} 条" + (" (未变化)" if status == "unchanged" else ""))
+
+    # 只翻译还没有译文的标题；复用的条目已带译文。
+    # 翻译失败时 translate_many 返回原文，此时存 None，下次运行（包括 304 复用时）重试
+    pending = [item for item in results if not item.get("title_zh") or item["title_zh"] == item["title"]]
+    zh = translate_many([item["title"] for item in pending])
+    for item in pending:
+        item["title_zh"] = zh[item["title"]] if zh[item["title"]] != item["title"] else None
 
-        time.sleep(0.5)
+    write_json_atomic(cache_path, feed_cache)
 
     print(f"  共获取 YouTube 视频: {len(results)} 条")
     return results
 
 # ── 读取本地新闻数据 ──────────────────────────────────────────────────────────
 
+def payload_items(data) -> list[dict]:
+    """取出 AI 视图条目，兼容 v1（完整列表）与 v2（条目表 + 索引）两种格式"""
+    if isinstance(data, list):
+        return data
+    if data.get("payload_version") == 2:
+        fields = data.get("item_fields") or []
+        table  = data.get("item_table") or []
+        return [dict(zip(fields, table[i])) for i in (data.get("views") or {}).get("items_ai") or []]
+    return data.get("items", [])
+
+
 def load_news(data_dir: Path, max_items: int = 20) -> list[dict]:
-    """读取 update_news.py 产出的 latest-24h.json"""
-    for fname in ["latest-24h.json", "latest.json", "snapshot.json"]:
+    """
+    读取 update_news.py 产出的新闻：优先 email-digest.json（已排序、已翻译的精简条目），
+    没有时退回完整的 latest-24h.json
+    """
+    for fname in ["email-digest.json", "latest-24h.json", "latest.json", "snapshot.json"]:
         p = data_dir / fname
         if p.exists():
             try:
                 data = json.loads(p.read_text(encoding="utf-8"))
-                items = data.get("items", data if isinstance(data, list) else [])
+                items = payload_items(data)
                 print(f"✅ 读取新闻: {p} ({len(items)} 条)")
                 return items[:max_items]
             except Exception as e:
@@ -297,34 +503,14 @@ def _esc(text: str) -> str:
             .replace('"', "&quot;"))
 
 
-def build_email(news_items: list[dict],
-                tw_items:   list[dict],
-                yt_items:   list[dict]) -> tuple[str, str]:
-    """生成 (html, plain) 邮件内容"""
+def render_common_sections(tw_items: list[dict], yt_items: list[dict]) -> dict:
+    """渲染所有订阅者共用的部分（日期、Twitter、YouTube），只需生成一次"""
 
     tz8  = timezone(timedelta(hours=8))
     now  = datetime.now(tz8)
     date_str = now.strftime("%Y年%m月%d日")
     time_str = now.strftime("%H:%M")
 
-    # ── 新闻 HTML ──
-    news_rows = ""
-    news_plain = ""
-    for i, item in enumerate(news_items, 1):
-        title = _esc(item.get("title_zh") or item.get("title") or "无标题")
-        url   = item.get("url", "#")
-        src   = _esc(item.get("source") or item.get("site_name") or "")
-        news_rows += f"""
-        <tr><td style="padding:10px 0;border-bottom:1px solid #f0f0f0;">
-          <a href="{url}" style="color:#1a73e8;font-weight:600;font-size:14px;text-decoration:none;">{i}. {title}</a>
-          {"<div style='color:#999;font-size:11px;margin-top:3px;'>📰 " + src + "</div>" if src else ""}
-        </td></tr>"""
-        news_plain += f"{i}. {item.get('title_zh') or item.get('title','')}\n   {url}\n\n"
-
-    if not news_rows:
-        news_rows = "<tr><td style='color:#999;padding:10px 0;'>今日暂无新闻数据</td></tr>"
-        news_plain = "今日暂无新闻数据\n"
-
     # ── Twitter HTML ──
     tw_rows = ""
     tw_plain = ""
@@ -393,6 +579,37 @@ def build_email(news_items: list[dict],
         yt_rows = "<tr><td style='color:#999;padding:10px 0;'>今日 YouTube 视频暂未获取到。</td></tr>"
         yt_plain = "今日 YouTube 视频暂未获取。\n"
 
+    return {
+        "date_str": date_str, "time_str": time_str,
+        "tw_rows": tw_rows, "tw_plain": tw_plain, "tw_count": len(tw_items),
+        "yt_rows": yt_rows, "yt_plain": yt_plain, "yt_count": len(yt_items),
+    }
+
+
+def assemble_email(news_items: list[dict], common: dict) -> tuple[str, str]:
+    """用共用部分加上（按订阅者挑选的）新闻生成 (html, plain) 邮件内容"""
+    date_str, time_str = common["date_str"], common["time_str"]
+    tw_rows, tw_plain = common["tw_rows"], common["tw_plain"]
+    yt_rows, yt_plain = common["yt_rows"], common["yt_plain"]
+
+    # ── 新闻 HTML ──
+    news_rows = ""
+    news_plain = ""
+    for i, item in enumerate(news_items, 1):
+        title = _esc(item.get("title_zh") or item.get("title") or "无标题")
+        url   = item.get("url", "#")
+        src   = _esc(item.get("source") or item.get("site_name") or "")
+        news_rows += f"""
+        <tr><td style="padding:10px 0;border-bottom:1px solid #f0f0f0;">
+          <a href="{url}" style="color:#1a73e8;font-weight:600;font-size:14px;text-decoration:none;">{i}. {title}</a>
+          {"<div style='color:#999;font-size:11px;margin-top:3px;'>📰 " + src + "</div>" if src else ""}
+        </td></tr>"""
+        news_plain += f"{i}. {item.get('title_zh') or item.get('title','')}\n   {url}\n\n"
+
+    if not news_rows:
+        news_rows = "<tr><td style='color:#999;padding:10px 0;'>今日暂无新闻数据</td></tr>"
+        news_plain = "今日暂无新闻数据\n"
+
     # ── 完整 HTML ──
     html = f"""<!DOCTYPE html>
 <html lang="zh">
@@ -422,7 +639,7 @@ def build_email(news_items: list[dict],
   <!-- Twitter 专家动态 -->
   <div style="padding:28px 32px;background:#f7fbff;">
     <div style="font-size:18px;font-weight:700;color:#222;margin-bottom:4px;padding-bottom:10px;border-bottom:3px solid #1da1f2;">
-      🐦 AI 专家 Twitter 动态 <span style="font-size:14px;color:#999;font-weight:400;">({len(tw_items)} 条)</span>
+      🐦 AI 专家 Twitter 动态 <span style="font-size:14px;color:#999;font-weight:400;">({common['tw_count']} 条)</span>
     </div>
     <div style="color:#999;font-size:12px;margin-bottom:14px;">
       追踪：{" · ".join(e["name"] for e in TWITTER_EXPERTS)}
@@ -433,7 +650,7 @@ def build_email(news_items: list[dict],
   <!-- YouTube 视频 -->
   <div style="padding:28px 32px;">
     <div style="font-size:18px;font-weight:700;color:#222;margin-bottom:4px;padding-bottom:10px;border-bottom:3px solid #ff0000;">
-      ▶ AI YouTube 频道 <span style="font-size:14px;color:#999;font-weight:400;">({len(yt_items)} 条)</span>
+      ▶ AI YouTube 频道 <span style="font-size:14px;color:#999;font-weight:400;">({common['yt_count']} 条)</span>
     </div>
     <div style="color:#999;font-size:12px;margin-bottom:14px;">
       频道：{" · ".join(c["name"] for c in YOUTUBE_CHANNELS)}
@@ -460,11 +677,11 @@ def build_email(news_items: list[dict],
 {news_plain}
 {"="*55}
 
-【AI 专家 Twitter 动态 ({len(tw_items)} 条)】
+【AI 专家 Twitter 动态 ({common['tw_count']} 条)】
 {tw_plain}
 {"="*55}
 
-【AI YouTube 频道 ({len(yt_items)} 条)】
+【AI YouTube 频道 ({common['yt_count']} 条)】
 {yt_plain}
 {"="*55}
 AI News Radar | 每日 07:30 北京时间自动发送
@@ -472,59 +689,225 @@ AI News Radar | 每日 07:30 北京时间自动发送
 
     return html, plain
 
+
+def build_email(news_items: list[dict],
+                tw_items:   list[dict],
+                yt_items:   list[dict]) -> tuple[str, str]:
+    """生成 (html, plain) 邮件内容"""
+    return assemble_email(news_items, render_common_sections(tw_items, yt_items))
+
+# ── 订阅者 ────────────────────────────────────────────────────────────────────
+
+def load_subscribers() -> list[dict]:
+    """
+    读取订阅者列表：优先 SUBSCRIBERS_JSON（JSON 字符串，适合放在 Secret 中），
+    其次 SUBSCRIBERS_FILE 指向的 JSON 文件；都没有时退回 RECEIVER_EMAIL（可逗号分隔多个）。
+    每个订阅者：{"email": ..., "sites": [...], "keywords": [...], "exclude_keywords": [...], "max_items": 20}
+    筛选后没有新闻的订阅者当天不发邮件；设置 "send_empty": true 则照常发送（只含 Twitter / YouTube）。
+    """
+    raw = os.environ.get("SUBSCRIBERS_JSON", "")
+    path = os.environ.get("SUBSCRIBERS_FILE", "")
+    if not raw and path:
+        try:
+            raw = Path(path).read_text(encoding="utf-8")
+        except OSError as e:
+            print(f"⚠️ {path}: {e}")
+    if raw:
+        try:
+            data = json.loads(raw)
+        except ValueError as e:
+            print(f"⚠️ 订阅者列表解析失败: {e}")
+            data = []
+        return [sub for sub in data if isinstance(sub, dict) and sub.get("email")] if isinstance(data, list) else []
+    receivers = os.environ.get("RECEIVER_EMAIL", "")
+    return [{"email": email.strip()} for email in receivers.split(",") if email.strip()]
+
+
+def select_news(items: list[dict], sub: dict) -> list[dict]:
+    """按订阅者的站点 / 关键词过滤新闻，保持原有排序，最多 max_items 条"""
+    sites    = set(sub.get("sites") or [])
+    keywords = [k.lower() for k in sub.get("keywords") or [] if k]
+    exclude  = [k.lower() for k in sub.get("exclude_keywords") or [] if k]
+    limit    = int(sub.get("max_items") or NEWS_PER_EMAIL)
+    out = []
+    for item in items:
+        if sites and item.get("site_id") not in sites:
+            continue
+        text = f"{item.get('title') or ''} {item.get('title_zh') or ''}".lower()
+        if keywords and not any(k in text for k in keywords):
+            continue
+        if any(k in text for k in exclude):
+            continue
+        out.append(item)
+        if len(out) >= limit:
+            break
+    return out
+
 # ── 发送邮件 ──────────────────────────────────────────────────────────────────
 
-def send_email(html: str, plain: str) -> bool:
+def smtp_config() -> Optional[dict]:
     server   = os.environ.get("SMTP_SERVER", "")
     port     = int(os.environ.get("SMTP_PORT", "587"))
     user     = os.environ.get("SENDER_EMAIL", "")
     password = os.environ.get("SMTP_PASSWORD", "")
-    receiver = os.environ.get("RECEIVER_EMAIL", "")
 
-    if not all([server, user, password, receiver]):
+    if not all([server, user, password]):
         missing = [k for k, v in {
-            "SMTP_SERVER": server, "SENDER_EMAIL": user,
-            "SMTP_PASSWORD": password, "RECEIVER_EMAIL": receiver
+            "SMTP_SERVER": server, "SENDER_EMAIL": user, "SMTP_PASSWORD": password
         }.items() if not v]
         print(f"❌ 缺少环境变量: {', '.join(missing)}")
-        return False
+        return None
+    # 变量存在但为空（如未设置的仓库变量）时同样按 auto 处理
+    security = (os.environ.get("SMTP_SECURITY") or "auto").strip().lower()
+    if security not in SMTP_SECURITY_MODES:
+        print(f"❌ SMTP_SECURITY 取值无效: {security}（可选 {' / '.join(SMTP_SECURITY_MODES)}）")
+        return None
+    return {"server": server, "port": port, "user": user, "password": password, "security": security}
+
+
+def open_smtp(config: dict) -> smtplib.SMTP:
+    """建立一条已登录的 SMTP 连接"""
+    server, port, security = config["server"], config["port"], config["security"]
+    ctx = ssl.create_default_context()
+    if security == "none":
+        return smtplib.SMTP(server, port, timeout=30)
+    if security == "ssl":
+        conn = smtplib.SMTP_SSL(server, port, context=ctx, timeout=30)
+        conn.login(config["user"], config["password"])
+        return conn
+    # 方案1: STARTTLS
+    try:
+        conn = smtplib.SMTP(server, port, timeout=30)
+        conn.ehlo(); conn.starttls(context=ctx); conn.ehlo()
+        conn.login(config["user"], config["password"])
+        return conn
+    except smtplib.SMTPAuthenticationError:
+        raise  # 账号密码错误，换端口也无济于事
+    except Exception as e:
+        if security != "auto":
+            raise
+        print(f"   STARTTLS:{port} 失败: {e}，改用 SSL:465")
+    # 方案2: SSL
+    conn = smtplib.SMTP_SSL(server, 465, context=ctx, timeout=30)
+    conn.login(config["user"], config["password"])
+    return conn
+
 
+def compose_message(sender: str, receiver: str, html: str, plain: str) -> MIMEMultipart:
     tz8   = timezone(timedelta(hours=8))
     today = datetime.now(tz8).strftime("%Y-%m-%d")
 
     msg = MIMEMultipart("alternative")
     msg["Subject"] = f"🤖 AI 新闻雷达日报 · {today}"
-    msg["From"]    = f"AI News Radar <{user}>"
+    msg["From"]    = f"AI News Radar <{sender}>"
     msg["To"]      = receiver
     msg.attach(MIMEText(plain, "plain", "utf-8"))
     msg.attach(MIMEText(html,  "html",  "utf-8"))
+    return msg
 
-    # 方案1: STARTTLS
-    try:
-        print(f"📤 STARTTLS:{port} → {receiver} ...")
-        with smtplib.SMTP(server, port, timeout=30) as s:
-            s.ehlo(); s.starttls(); s.ehlo()
-            s.login(user, password)
-            s.send_message(msg)
-        print("✅ 邮件发送成功！")
-        return True
-    except Exception as e:
-        print(f"   STARTTLS 失败: {e}")
 
-    # 方案2: SSL
-    try:
-        print("📤 SSL:465 ...")
-        ctx = ssl.create_default_context()
-        with smtplib.SMTP_SSL(server, 465, context=ctx, timeout=30) as s:
-            s.login(user, password)
-            s.send_message(msg)
-        print("✅ 邮件发送成功 (SSL)！")
-        return True
-    except Exception as e:
-        print(f"   SSL:465 失败: {e}")
+def build_messages(sender: str, subscribers: list[dict], news_pool: list[dict], common: dict) -> tuple[list[MIMEMultipart], list[int], list[str]]:
+    """
+    为每位订阅者生成邮件，返回 (邮件列表, 每封 HTML 字节数, 被跳过的邮箱)。
+    新闻筛选结果为空的订阅者跳过，除非其设置了 "send_empty": true。
+    """
+    messages, sizes, skipped = [], [], []
+    for sub in subscribers:
+        news = select_news(news_pool, sub)
+        if not news and not sub.get("send_empty"):
+            skipped.append(sub["email"])
+            continue
+        html_body, plain_body = assemble_email(news, common)
+        messages.append(compose_message(sender, sub["email"], html_body, plain_body))
+        sizes.append(len(html_body.encode("utf-8")))
+    return messages, sizes, skipped
+
+
+def deliver_all(messages: list[MIMEMultipart], config: dict, pool_size: int = SMTP_POOL_SIZE) -> dict:
+    """
+    用少量常驻 SMTP 连接并发投递：每个线程持有一条连接连续发送。
+    发送中连接断开时重连并重试一次；单个收件人被拒只记为该封失败；
+    无法连接或登录失败则停止整个连接池，剩余邮件记为失败（避免反复登录触发限流或封号）
+    """
+    pending: "queue.Queue[MIMEMultipart]" = queue.Queue()
+    for msg in messages:
+        pending.put(msg)
+    stats = {"sent": 0, "failed": 0, "connections": 0, "errors": []}
+    lock = threading.Lock()
+    fatal = threading.Event()
+
+    def fail(msg: MIMEMultipart, error: object) -> None:
+        with lock:
+            stats["failed"] += 1
+            stats["errors"].append(f"{msg['To']}: {error}")
+
+    def drop(conn: Optional[smtplib.SMTP]) -> None:
+        try:
+            if conn is not None:
+                conn.close()
+        except Exception:
+            pass
 
-    print("❌ 所有 SMTP 方案均失败")
-    return False
+    def worker() -> None:
+        conn = None
+        while not fatal.is_set():
+            try:
+                msg = pending.get_nowait()
+            except queue.Empty:
+                break
+            for attempt in (1, 2):
+                if conn is None:
+                    if fatal.is_set():
+                        pending.put(msg)  # 留给下面统一记为失败
+                        break
+                    try:
+                        conn = open_smtp(config)
+                    except Exception as e:
+                        fatal.set()
+                        fail(msg, f"SMTP 连接/登录失败，停止发送: {e}")
+                        break
+                    with lock:
+                        stats["connections"] += 1
+                try:
+                    conn.send_message(msg)
+                    with lock:
+                        stats["sent"] += 1
+                    break
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                    fail(msg, e)
+                    break
+                except smtplib.SMTPServerDisconnected as e:  # 连接被断开：重连重试一次
+                    drop(conn)
+                    conn = None
+                    if attempt == 2:
+                        fail(msg, e)
+                except smtplib.SMTPException as e:  # 其它协议错误：不重试
+                    fail(msg, e)
+                    break
+                except OSError as e:  # 发送中的网络错误：重连重试一次
+                    drop(conn)
+                    conn = None
+                    if attempt == 2:
+                        fail(msg, e)
+        if conn is not None:
+            try:
+                conn.quit()
+            except Exception:
+                pass
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(max(1, min(pool_size, len(messages))))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    while True:
+        try:
+            fail(pending.get_nowait(), "未发送（SMTP 连接不可用）")
+        except queue.Empty:
+            break
+    stats["seconds"] = time.perf_counter() - start
+    return stats
 
 # ── 主函数 ────────────────────────────────────────────────────────────────────
 
@@ -532,8 +915,15 @@ def main():
     print("🚀 AI News Radar — 邮件系统 v3")
     print("=" * 55)
 
-    # 1. 读取本地新闻
-    news_items = load_news(DATA_DIR, max_items=20)
+    config = smtp_config()
+    subscribers = load_subscribers()
+    if config is None or not subscribers:
+        if not subscribers:
+            print("❌ 没有订阅者：请设置 SUBSCRIBERS_JSON / SUBSCRIBERS_FILE 或 RECEIVER_EMAIL")
+        sys.exit(1)
+
+    # 1. 读取本地新闻（取足够多的候选，供各订阅者按条件挑选）
+    news_pool = load_news(DATA_DIR, max_items=NEWS_POOL_SIZE)
 
     # 2. 实时抓取 Twitter 专家动态
     tw_items = fetch_twitter_experts()
@@ -541,20 +931,37 @@ def main():
     # 3. 实时抓取 YouTube 频道
     yt_items = fetch_youtube_channels()
 
-    # 4. 构建邮件
-    print("\n📧 构建邮件内容...")
-    html_body, plain_body = build_email(news_items, tw_items, yt_items)
-    print(f"   HTML: {len(html_body):,} 字节")
+    # 4. 构建邮件：共用部分只渲染一次，新闻部分按订阅者挑选
+    print(f"\n📧 构建邮件内容（{len(subscribers)} 位订阅者）...")
+    common = render_common_sections(tw_items, yt_items)
+    messages, sizes, skipped = build_messages(config["user"], subscribers, news_pool, common)
+    if skipped:
+        print(f"   跳过 {len(skipped)} 位订阅者（新闻筛选结果为空）")
+    if sizes:
+        print(f"   HTML: 每封 {min(sizes):,}–{max(sizes):,} 字节")
 
     # 5. 发送
-    print("\n📬 发送邮件...")
-    ok = send_email(html_body, plain_body)
+    if messages:
+        print(f"\n📬 发送邮件（{min(SMTP_POOL_SIZE, len(messages))} 条 SMTP 连接）...")
+        stats = deliver_all(messages, config)
+        rate = stats["sent"] / stats["seconds"] if stats["seconds"] else 0.0
+        print(f"   成功 {stats['sent']} 封 | 失败 {stats['failed']} 封 | 连接 {stats['connections']} 条 | "
+              f"用时 {stats['seconds']:.1f}s（{rate:.1f} 封/秒）")
+        for error in stats["errors"][:10]:
+            print(f"   ❌ {error}")
+        ok = stats["sent"] > 0 and stats["failed"] == 0
+    else:
+        print("\n⚠️ 今日没有需要发送的邮件")
+        ok = True
+
+    if _title_cache is not None:
+        translation.save_title_cache(_title_cache)
+    print(translation.STATS.summary())
 
     print("\n" + "=" * 55)
     print(f"{'✅ 完成' if ok else '❌ 失败'} — "
-          f"新闻 {len(news_items)} 条 | Twitter {len(tw_items)} 条 | YouTube {len(yt_items)} 条")
+          f"订阅者 {len(subscribers)} 位 | 新闻候选 {len(news_pool)} 条 | Twitter {len(tw_items)} 条 | YouTube {len(yt_items)} 条")
     sys.exit(0 if ok else 1)
 
-
 if __name__ == "__main__":
     main()
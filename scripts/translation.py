@@ -0,0 +1,400 @@
+"""Title translation shared by update_news.py and send_email.py.
+
+EN -> zh-CN through the public gtx endpoint: titles are batched and sent
+concurrently under a per-host rate limit, and results are kept in a bucketed
+cache under data/title-zh-cache/. STATS counts cache hits, misses and request
+latency for the summary line each script prints at exit. The CJK checks and
+atomic file writes used by both scripts live here too.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+
+CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+# Text with a larger share of CJK characters is treated as already Chinese.
+MAX_CJK_SHARE_TO_TRANSLATE = 0.2
+
+
+def has_cjk(text: str) -> bool:
+    return bool(CJK_RE.search(text or ""))
+
+
+def needs_translation(text: str) -> bool:
+    """Non-empty text that is not already mostly Chinese."""
+    return bool(text) and len(CJK_RE.findall(text)) / len(text) <= MAX_CJK_SHARE_TO_TRANSLATE
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    # Write next to the target and rename, so readers never see a half-written file.
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def write_bytes_if_changed(path: Path, data: bytes) -> bool:
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    atomic_write_bytes(path, data)
+    return True
+
+
+@dataclass
+class TranslationStats:
+    # Titles resolved from update_news' archive URL -> Chinese title index, before the cache.
+    url_index_hits: int = 0
+    hits: int = 0
+    misses: int = 0
+    requests: int = 0
+    failures: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_request(self, seconds: float, ok: bool) -> None:
+        with self.lock:
+            self.requests += 1
+            self.failures += not ok
+            self.latency_total += seconds
+            self.latency_max = max(self.latency_max, seconds)
+
+    def summary(self) -> str:
+        resolved = self.url_index_hits + self.hits
+        looked_up = resolved + self.misses
+        hit_rate = f"{resolved / looked_up:.0%}" if looked_up else "n/a"
+        avg_ms = self.latency_total / self.requests * 1000 if self.requests else 0.0
+        return (
+            f"Translation: {self.url_index_hits} URL index hits, {self.hits} cache hits, "
+            f"{self.misses} misses ({hit_rate} without a request), "
+            f"{self.requests} requests, {self.failures} failed, "
+            f"latency avg {avg_ms:.0f} ms / max {self.latency_max * 1000:.0f} ms"
+        )
+
+
+STATS = TranslationStats()
+
+
+def load_title_zh_cache(path: Path) -> dict[str, str]:
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if isinstance(data, dict):
+            return {str(k): str(v) for k, v in data.items() if str(k).strip() and str(v).strip()}
+    except Exception:
+        pass
+    return {}
+
+
+# Title translations live in hash buckets under data/title-zh-cache/, so a run
+# only reads the buckets of the titles it looks up and rewrites the ones that
+# changed. Changing TITLE_CACHE_BUCKETS orphans the existing files.
+TITLE_CACHE_BUCKETS = 64
+TITLE_CACHE_MAX_ENTRIES = 20000
+TITLE_CACHE_MAX_AGE_DAYS = 60
+
+
+def title_cache_bucket(title: str) -> int:
+    return int(hashlib.sha1(title.encode("utf-8")).hexdigest()[:8], 16) % TITLE_CACHE_BUCKETS
+
+
+def title_cache_bucket_filename(bucket: int) -> str:
+    return f"{bucket:02x}.json"
+
+
+class TitleCache:
+    """Title -> zh translation cache, loaded and written one bucket at a time.
+
+    Entries record the day they were last used rather than a timestamp, so
+    repeated hits within a day do not rewrite a bucket.
+    """
+
+    def __init__(self, root: Path, today: str) -> None:
+        self.root = root
+        self.today = today
+        # bucket -> title -> [zh, last used day]; only buckets read so far.
+        self.buckets: dict[int, dict[str, list[str]]] = {}
+        self.dirty: set[int] = set()
+
+    def _bucket(self, bucket: int) -> dict[str, list[str]]:
+        entries = self.buckets.get(bucket)
+        if entries is None:
+            entries = {}
+            try:
+                data = json.loads((self.root / title_cache_bucket_filename(bucket)).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = None
+            if isinstance(data, dict):
+                for title, entry in data.items():
+                    if isinstance(entry, list) and len(entry) == 2 and str(entry[0]).strip():
+                        entries[str(title)] = [str(entry[0]), str(entry[1])]
+            self.buckets[bucket] = entries
+        return entries
+
+    def get(self, title: str, default: str | None = None) -> str | None:
+        bucket = title_cache_bucket(title)
+        entry = self._bucket(bucket).get(title)
+        if entry is None:
+            return default
+        if entry[1] != self.today:
+            entry[1] = self.today
+            self.dirty.add(bucket)
+        return entry[0]
+
+    def __contains__(self, title: object) -> bool:
+        return isinstance(title, str) and self.get(title) is not None
+
+    def __setitem__(self, title: str, zh: str) -> None:
+        bucket = title_cache_bucket(title)
+        self._bucket(bucket)[title] = [zh, self.today]
+        self.dirty.add(bucket)
+
+    def update(self, translations: Mapping[str, str]) -> None:
+        for title, zh in translations.items():
+            self[title] = zh
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.buckets.values())
+
+
+def evict_title_cache_bucket(entries: dict[str, list[str]], today: str) -> dict[str, list[str]]:
+    cutoff = (date.fromisoformat(today) - timedelta(days=TITLE_CACHE_MAX_AGE_DAYS)).isoformat()
+    live = sorted(
+        ((title, entry) for title, entry in entries.items() if entry[1] >= cutoff),
+        key=lambda kv: (kv[1][1], kv[0]),
+        reverse=True,
+    )
+    return dict(live[: TITLE_CACHE_MAX_ENTRIES // TITLE_CACHE_BUCKETS])
+
+
+def encode_title_cache_bucket(entries: dict[str, list[str]]) -> bytes:
+    # One entry per line keeps diffs of the committed files small.
+    lines = [
+        f"{json.dumps(title, ensure_ascii=False)}:{json.dumps(entry, ensure_ascii=False)}"
+        for title, entry in sorted(entries.items())
+    ]
+    return ("{\n" + ",\n".join(lines) + "\n}\n").encode("utf-8")
+
+
+def save_title_cache(cache: TitleCache) -> int:
+    """Evict and write the buckets changed this run; returns how many files changed."""
+    changed = 0
+    for bucket in sorted(cache.dirty):
+        entries = evict_title_cache_bucket(cache.buckets[bucket], cache.today)
+        cache.buckets[bucket] = entries
+        path = cache.root / title_cache_bucket_filename(bucket)
+        if entries:
+            changed += write_bytes_if_changed(path, encode_title_cache_bucket(entries))
+        elif path.exists():
+            path.unlink()
+            changed += 1
+    cache.dirty.clear()
+    return changed
+
+
+def open_title_cache(root: Path, today: str, legacy_path: Path | None = None) -> TitleCache:
+    cache = TitleCache(root, today)
+    if root.exists() or legacy_path is None or not legacy_path.exists():
+        root.mkdir(parents=True, exist_ok=True)
+        return cache
+    root.mkdir(parents=True, exist_ok=True)
+    cache.update(load_title_zh_cache(legacy_path))
+    save_title_cache(cache)
+    legacy_path.unlink()
+    return cache
+
+
+TRANSLATE_ENDPOINT = "https://translate.googleapis.com/translate_a/single"
+# Batched titles are joined with newlines, which the endpoint keeps line for
+# line; a batch whose line count comes back different is retried title by title.
+TRANSLATE_BATCH_DELIMITER = "\n"
+TRANSLATE_BATCH_MAX_TITLES = 16
+TRANSLATE_BATCH_MAX_CHARS = 1200
+TRANSLATE_WORKERS = 4
+TRANSLATE_MAX_RPS = 5.0
+
+
+class HostRateLimiter:
+    """Spaces request starts to each host at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_at: dict[str, float] = {}
+
+    def wait(self, url: str) -> None:
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_at.get(host, 0.0))
+            self.next_at[host] = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def request_translation(
+    session: requests.Session,
+    text: str,
+    endpoint: str = TRANSLATE_ENDPOINT,
+    limiter: HostRateLimiter | None = None,
+) -> str | None:
+    if limiter is not None:
+        limiter.wait(endpoint)
+    started = time.perf_counter()
+    try:
+        r = session.get(
+            endpoint,
+            params={
+                "client": "gtx",
+                "sl": "auto",
+                "tl": "zh-CN",
+                "dt": "t",
+                "q": text,
+            },
+            timeout=12,
+        )
+        r.raise_for_status()
+        payload = r.json()
+        segs = payload[0] if isinstance(payload, list) and payload else None
+        if not isinstance(segs, list):
+            raise ValueError("unexpected translation payload")
+        text = "".join(str(seg[0]) for seg in segs if isinstance(seg, list) and seg and seg[0])
+    except Exception:
+        STATS.record_request(time.perf_counter() - started, False)
+        return None
+    STATS.record_request(time.perf_counter() - started, True)
+    return text
+
+
+def translate_to_zh_cn(
+    session: requests.Session,
+    text: str,
+    endpoint: str = TRANSLATE_ENDPOINT,
+    limiter: HostRateLimiter | None = None,
+) -> str | None:
+    s = (text or "").strip()
+    if not s:
+        return None
+    translated = (request_translation(session, s, endpoint, limiter) or "").strip()
+    if translated and translated != s:
+        return translated
+    return None
+
+
+def translate_batch_to_zh_cn(
+    session: requests.Session,
+    titles: list[str],
+    endpoint: str = TRANSLATE_ENDPOINT,
+    limiter: HostRateLimiter | None = None,
+) -> list[str | None]:
+    if len(titles) == 1:
+        return [translate_to_zh_cn(session, titles[0], endpoint, limiter)]
+    lines = [" ".join(t.split()) for t in titles]
+    raw = request_translation(session, TRANSLATE_BATCH_DELIMITER.join(lines), endpoint, limiter)
+    if raw is None:
+        # The request itself failed; per-title retries would hit the same endpoint
+        # len(titles) more times. The titles are picked up again next run.
+        return [None] * len(titles)
+    parts = raw.strip("\n").split(TRANSLATE_BATCH_DELIMITER) if raw else []
+    # Only a reply that lost or merged lines is retried title by title.
+    if len(parts) != len(titles):
+        return [translate_to_zh_cn(session, t, endpoint, limiter) for t in titles]
+    out: list[str | None] = []
+    for line, part in zip(lines, parts):
+        part = part.strip()
+        out.append(part if part and part != line else None)
+    return out
+
+
+def plan_translation_batches(titles: list[str]) -> list[list[str]]:
+    batches: list[list[str]] = []
+    current: list[str] = []
+    size = 0
+    for title in titles:
+        if current and (len(current) >= TRANSLATE_BATCH_MAX_TITLES or size + len(title) > TRANSLATE_BATCH_MAX_CHARS):
+            batches.append(current)
+            current, size = [], 0
+        current.append(title)
+        size += len(title) + 1
+    if current:
+        batches.append(current)
+    return batches
+
+
+def translate_titles(
+    session: requests.Session,
+    titles: list[str],
+    workers: int = TRANSLATE_WORKERS,
+    endpoint: str = TRANSLATE_ENDPOINT,
+    rate: float = TRANSLATE_MAX_RPS,
+) -> dict[str, str]:
+    """Translate titles in concurrent batches; returns only results that contain CJK."""
+    limiter = HostRateLimiter(rate)
+    out: dict[str, str] = {}
+    batches = plan_translation_batches(titles)
+    if not batches:
+        return out
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as executor:
+        futures = {executor.submit(translate_batch_to_zh_cn, session, b, endpoint, limiter): b for b in batches}
+        for future in as_completed(futures):
+            for title, zh in zip(futures[future], future.result()):
+                if zh and has_cjk(zh):
+                    out[title] = zh
+    return out
+
+
+def translate_cached(
+    session: requests.Session,
+    texts: list[str],
+    cache: TitleCache | dict[str, str],
+    max_new: int | None = None,
+    workers: int = TRANSLATE_WORKERS,
+    endpoint: str = TRANSLATE_ENDPOINT,
+    rate: float = TRANSLATE_MAX_RPS,
+) -> dict[str, str]:
+    """Return text -> zh for every text that is cached or could be translated.
+
+    Misses are translated in the order given, up to max_new of them, and
+    stored in the cache.
+    """
+    out: dict[str, str] = {}
+    missing: list[str] = []
+    for text in dict.fromkeys(texts):
+        zh = cache.get(text)
+        if zh:
+            out[text] = zh
+        else:
+            missing.append(text)
+    STATS.hits += len(out)
+    STATS.misses += len(missing)
+    if max_new is not None:
+        missing = missing[: max(0, max_new)]
+    translated = translate_titles(session, missing, workers=workers, endpoint=endpoint, rate=rate)
+    cache.update(translated)
+    out.update(translated)
+    return out
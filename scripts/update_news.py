@@ -4,13 +4,21 @@
 from __future__ import annotations
 
 import argparse
+import bisect
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import gzip
 import hashlib
+import io
 import json
-import random
+import os
 import re
+import shutil
+import struct
+import sys
 import time
 import xml.etree.ElementTree as ET
+from collections import Counter, OrderedDict
+from collections.abc import Collection, Iterable, Mapping
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
@@ -29,6 +37,16 @@ try:
 except ModuleNotFoundError:
     feedparser = None
 
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+try:
+    from scripts import translation
+except ModuleNotFoundError:
+    import translation
+
 UTC = timezone.utc
 BROWSER_UA = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -103,7 +121,25 @@ def parse_iso(dt_str: str | None) -> datetime | None:
     return dt.astimezone(UTC)
 
 
+# Raw URL -> canonical URL. Canonical URLs map to themselves, so normalizing an
+# already canonical URL (make_item_id at ingest) is a lookup too. Oldest entries
+# are evicted first once the memo is full.
+URL_MEMO_SIZE = 65536
+URL_MEMO: OrderedDict[str, str] = OrderedDict()
+
+
 def normalize_url(raw_url: str) -> str:
+    canonical = URL_MEMO.get(raw_url)
+    if canonical is None:
+        canonical = canonicalize_url(raw_url)
+        while len(URL_MEMO) >= URL_MEMO_SIZE - 1:
+            URL_MEMO.popitem(last=False)
+        URL_MEMO[raw_url] = canonical
+        URL_MEMO[canonical] = canonical
+    return canonical
+
+
+def canonicalize_url(raw_url: str) -> str:
     try:
         parsed = urlparse(raw_url.strip())
         if not parsed.scheme:
@@ -146,6 +182,13 @@ def host_of_url(raw_url: str) -> str:
         return ""
 
 
+def record_url(item: Mapping[str, Any]) -> str:
+    # Archive records carry the canonical URL and its host from ingest.
+    if item.get("host") is not None:
+        return str(item.get("url") or "")
+    return normalize_url(str(item.get("url") or ""))
+
+
 def first_non_empty(*values: Any) -> str:
     for value in values:
         if value is None:
@@ -173,20 +216,23 @@ def maybe_fix_mojibake(text: str) -> str:
     return s
 
 
-def has_cjk(text: str) -> bool:
-    return bool(re.search(r"[\u4e00-\u9fff]", text or ""))
-
-
 def is_mostly_english(text: str) -> bool:
     s = (text or "").strip()
     if not s:
         return False
-    if has_cjk(s):
+    if translation.has_cjk(s):
         return False
     letters = re.findall(r"[A-Za-z]", s)
     return len(letters) >= max(6, len(s) // 4)
 
 
+def title_language(title: str) -> str:
+    """"zh" for CJK titles, "en" for mostly-English ones, "" otherwise."""
+    if translation.has_cjk(title):
+        return "zh"
+    return "en" if is_mostly_english(title) else ""
+
+
 def parse_feed_entries_via_xml(feed_xml: bytes) -> list[dict[str, Any]]:
     out: list[dict[str, Any]] = []
     seen: set[tuple[str, str]] = set()
@@ -1059,7 +1105,7 @@ def normalize_aihubtoday_records(items: list[dict[str, Any]]) -> list[dict[str,
         if str(item.get("site_id") or "") != "aihubtoday":
             keep.append(item)
             continue
-        url = normalize_url(str(item.get("url") or ""))
+        url = record_url(item)
         if not url:
             continue
         by_url.setdefault(url, []).append(item)
@@ -1069,16 +1115,10 @@ def normalize_aihubtoday_records(items: list[dict[str, Any]]) -> list[dict[str,
             continue
         preferred = [g for g in group if not is_hubtoday_generic_anchor_title(str(g.get("title") or ""))]
         source = preferred if preferred else group
-        best = max(
-            source,
-            key=lambda x: (
-                event_time(x) or datetime.min.replace(tzinfo=UTC),
-                str(x.get("id") or ""),
-            ),
-        )
+        best = max(source, key=lambda x: (event_sort_key(x), str(x.get("id") or "")))
         keep.append(best)
 
-    keep.sort(key=lambda x: event_time(x) or datetime.min.replace(tzinfo=UTC), reverse=True)
+    keep.sort(key=event_sort_key, reverse=True)
     return keep
 
 
@@ -1430,7 +1470,10 @@ def fetch_newsnow(session: requests.Session, now: datetime) -> list[RawItem]:
     return out
 
 
-def collect_all(session: requests.Session, now: datetime) -> tuple[list[RawItem], list[dict[str, Any]]]:
+def collect_all(
+    session: requests.Session, now: datetime, only: Collection[str] | None = None
+) -> tuple[list[RawItem], list[dict[str, Any]]]:
+    """Fetch every site, or just the site ids in `only`."""
     tasks = [
         ("techurls", "TechURLs", fetch_techurls),
         ("buzzing", "Buzzing", fetch_buzzing),
@@ -1448,6 +1491,8 @@ def collect_all(session: requests.Session, now: datetime) -> tuple[list[RawItem]
     statuses: list[dict[str, Any]] = []
 
     for site_id, site_name, fn in tasks:
+        if only is not None and site_id not in only:
+            continue
         start = time.perf_counter()
         error = None
         count = 0
@@ -1709,12 +1754,513 @@ def load_archive(path: Path) -> dict[str, dict[str, Any]]:
     return out
 
 
-def event_time(record: dict[str, Any]) -> datetime | None:
+# Cached epoch seconds for the ISO timestamps; internal to the archive, never in latest-24h.json.
+EPOCH_FIELDS: tuple[tuple[str, str], ...] = (
+    ("published_at", "published_ts"),
+    ("first_seen_at", "first_seen_ts"),
+    ("last_seen_at", "last_seen_ts"),
+)
+# Fields derived by normalize_record; stored on archive records, never published.
+DERIVED_RECORD_FIELDS: tuple[str, ...] = (
+    "display_title",
+    "display_source",
+    "placeholder",
+    "topic_ai",
+    "title_lang",
+    "rules_version",
+)
+# Refreshed on every sighting. Kept in the archive but never published, so a run
+# that fetches the same items leaves the latest outputs byte-identical.
+PER_RUN_RECORD_FIELDS: tuple[str, ...] = ("last_seen_at",)
+INTERNAL_RECORD_FIELDS: frozenset[str] = frozenset(
+    {
+        "published_ts",
+        "first_seen_ts",
+        "last_seen_ts",
+        "event_ts",
+        "host",
+        *DERIVED_RECORD_FIELDS,
+        *PER_RUN_RECORD_FIELDS,
+    }
+)
+MISSING_TS = float("-inf")
+
+
+def epoch_of(value: Any) -> float | None:
+    dt = parse_iso(value)
+    return dt.timestamp() if dt else None
+
+
+def derive_event_ts(record: dict[str, Any]) -> float | None:
     # RSS sources must rely on the source's publish time only.
     # first_seen_at is fetch time and would falsely mark historical items as "24h".
+    published = record.get("published_ts")
     if str(record.get("site_id") or "") == "opmlrss":
-        return parse_iso(record.get("published_at"))
-    return parse_iso(record.get("published_at")) or parse_iso(record.get("first_seen_at"))
+        return published
+    return published if published is not None else record.get("first_seen_ts")
+
+
+def attach_epoch_fields(record: dict[str, Any]) -> dict[str, Any]:
+    for iso_key, ts_key in EPOCH_FIELDS:
+        if ts_key not in record:
+            record[ts_key] = epoch_of(record.get(iso_key))
+    record["event_ts"] = derive_event_ts(record)
+    return record
+
+
+def event_ts(record: dict[str, Any]) -> float | None:
+    if "event_ts" in record:
+        return record["event_ts"]
+    return derive_event_ts({ts_key: epoch_of(record.get(iso_key)) for iso_key, ts_key in EPOCH_FIELDS} | record)
+
+
+def event_sort_key(record: dict[str, Any]) -> float:
+    ts = event_ts(record)
+    return MISSING_TS if ts is None else ts
+
+
+def public_record(record: dict[str, Any]) -> dict[str, Any]:
+    return {k: v for k, v in record.items() if k not in INTERNAL_RECORD_FIELDS}
+
+
+RECORD_FIELDS: tuple[str, ...] = (
+    "id",
+    "site_id",
+    "site_name",
+    "source",
+    "title",
+    "url",
+    "published_at",
+    "first_seen_at",
+    "last_seen_at",
+    "published_ts",
+    "first_seen_ts",
+    "last_seen_ts",
+    "event_ts",
+    # Host of the canonical URL, set at ingest together with it.
+    "host",
+    *DERIVED_RECORD_FIELDS,
+)
+RECORD_FIELD_SET = frozenset(RECORD_FIELDS)
+# Low-cardinality strings repeated across most of the archive.
+INTERNED_FIELDS = frozenset({"site_id", "site_name", "source", "host", "display_source", "title_lang"})
+
+
+class ArchiveRecord(Mapping):
+    """Slotted archive row; reads like a dict so the filters take it unchanged."""
+
+    __slots__ = RECORD_FIELDS + ("extra",)
+
+    def __init__(self, **fields: Any) -> None:
+        self.extra: dict[str, Any] | None = None
+        for key in RECORD_FIELDS:
+            object.__setattr__(self, key, None)
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ArchiveRecord:
+        if "event_ts" not in data:
+            attach_epoch_fields(data)
+        return cls(**data)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in RECORD_FIELD_SET:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in INTERNED_FIELDS and isinstance(value, str):
+            value = sys.intern(value)
+        if key in RECORD_FIELD_SET:
+            object.__setattr__(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __iter__(self):
+        yield from RECORD_FIELDS
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return len(RECORD_FIELDS) + len(self.extra or ())
+
+
+class RecordView(Mapping):
+    """Copy-on-write overlay: a few changed fields on top of a shared record."""
+
+    __slots__ = ("base", "changes")
+
+    def __init__(self, base: Mapping, changes: dict[str, Any]) -> None:
+        if isinstance(base, RecordView):
+            changes = {**base.changes, **changes}
+            base = base.base
+        self.base = base
+        self.changes = changes
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.changes:
+            return self.changes[key]
+        return self.base[key]
+
+    def __iter__(self):
+        yield from self.base
+        for key in self.changes:
+            if key not in self.base:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+# Top-level keys that change on every run and must not count as a content change.
+VOLATILE_OUTPUT_KEYS: frozenset[str] = frozenset({"generated_at"})
+
+
+def output_content_hash(payload: Any) -> str:
+    if isinstance(payload, dict):
+        payload = {k: v for k, v in payload.items() if k not in VOLATILE_OUTPUT_KEYS}
+    data = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def write_json_if_changed(path: Path, payload: Any) -> bool:
+    """Atomically write payload as JSON unless only its volatile keys changed."""
+    try:
+        previous = json.loads(path.read_text(encoding="utf-8"))
+        if output_content_hash(previous) == output_content_hash(payload):
+            return False
+    except (OSError, ValueError):
+        pass
+    translation.atomic_write_bytes(path, json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8"))
+    return True
+
+
+ARCHIVE_STORE_VERSION = 1
+ARCHIVE_DAY_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+@dataclass
+class ArchiveStore:
+    root: Path
+    # day -> manifest entry ({"file": ..., "records": ...}) for every partition on disk.
+    partitions: dict[str, dict[str, Any]]
+    # item id -> day of the partition that holds the live copy of the record.
+    index: dict[str, str]
+
+
+def archive_partition_day(record: dict[str, Any], now: datetime) -> str:
+    # iso() always writes "YYYY-MM-DDTHH:MM:SS...Z" in UTC, so the day is the prefix.
+    for key in ("last_seen_at", "published_at", "first_seen_at"):
+        value = str(record.get(key) or "")
+        if len(value) >= 10 and ARCHIVE_DAY_RE.match(value[:10]):
+            return value[:10]
+        dt = parse_iso(value)
+        if dt:
+            return dt.date().isoformat()
+    return now.date().isoformat()
+
+
+def archive_partition_filename(day: str) -> str:
+    return f"{day}.jsonl.gz"
+
+
+def read_archive_partition(path: Path) -> list[dict[str, Any]]:
+    if not path.exists():
+        return []
+    out: list[dict[str, Any]] = []
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except Exception:
+                    continue
+                if isinstance(rec, dict) and rec.get("id"):
+                    out.append(rec)
+    except (OSError, EOFError):
+        return out
+    return out
+
+
+def encode_archive_partition(records: list[dict[str, Any]]) -> bytes:
+    lines = [
+        json.dumps(dict(r), ensure_ascii=False, separators=(",", ":"))
+        for r in sorted(records, key=lambda x: str(x["id"]))
+    ]
+    # mtime=0 keeps the bytes stable for identical content.
+    return gzip.compress(("\n".join(lines) + "\n").encode("utf-8"), mtime=0)
+
+
+def write_archive_partition(store: ArchiveStore, day: str, records: list[dict[str, Any]]) -> None:
+    filename = archive_partition_filename(day)
+    translation.write_bytes_if_changed(store.root / filename, encode_archive_partition(records))
+    store.partitions[day] = {"file": filename, "records": len(records)}
+
+
+def write_archive_manifest(store: ArchiveStore, now: datetime) -> None:
+    live_by_day: dict[str, int] = {}
+    for day in store.index.values():
+        live_by_day[day] = live_by_day.get(day, 0) + 1
+    manifest = {
+        "version": ARCHIVE_STORE_VERSION,
+        "generated_at": iso(now),
+        "total_items": len(store.index),
+        "partitions": [
+            {
+                "day": day,
+                "file": entry["file"],
+                "records": int(entry.get("records") or 0),
+                "live": live_by_day.get(day, 0),
+            }
+            for day, entry in sorted(store.partitions.items(), reverse=True)
+        ],
+    }
+    write_json_if_changed(store.root / "manifest.json", manifest)
+    translation.write_bytes_if_changed(
+        store.root / "index.json.gz",
+        gzip.compress(json.dumps(store.index, sort_keys=True, separators=(",", ":")).encode("utf-8"), mtime=0),
+    )
+
+
+def migrate_legacy_archive(store: ArchiveStore, legacy_path: Path, now: datetime) -> None:
+    legacy = load_archive(legacy_path)
+    by_day: dict[str, list[dict[str, Any]]] = {}
+    for item_id, record in legacy.items():
+        attach_epoch_fields(record)
+        day = archive_partition_day(record, now)
+        by_day.setdefault(day, []).append(record)
+        store.index[item_id] = day
+    for day, records in by_day.items():
+        write_archive_partition(store, day, records)
+
+
+def open_archive_store(root: Path, now: datetime, legacy_path: Path | None = None) -> ArchiveStore:
+    root.mkdir(parents=True, exist_ok=True)
+    store = ArchiveStore(root=root, partitions={}, index={})
+    manifest_path = root / "manifest.json"
+    if not manifest_path.exists():
+        if legacy_path is not None and legacy_path.exists():
+            migrate_legacy_archive(store, legacy_path, now)
+            write_archive_manifest(store, now)
+            legacy_path.unlink()
+        return store
+
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except Exception:
+        manifest = {}
+    for entry in manifest.get("partitions", []) if isinstance(manifest, dict) else []:
+        day = str(entry.get("day") or "")
+        if ARCHIVE_DAY_RE.match(day) and (root / str(entry.get("file") or "")).exists():
+            store.partitions[day] = {"file": entry["file"], "records": int(entry.get("records") or 0)}
+
+    try:
+        index = json.loads(gzip.decompress((root / "index.json.gz").read_bytes()).decode("utf-8"))
+    except Exception:
+        index = None
+    if isinstance(index, dict):
+        store.index = {str(k): str(v) for k, v in index.items() if str(v) in store.partitions}
+    else:
+        # Index lost: rebuild it from the partitions, newest copy wins.
+        for day in sorted(store.partitions):
+            for rec in read_archive_partition(root / store.partitions[day]["file"]):
+                store.index[str(rec["id"])] = day
+    return store
+
+
+def load_archive_partitions(store: ArchiveStore, days: list[str]) -> dict[str, dict[str, Any]]:
+    out: dict[str, dict[str, Any]] = {}
+    for day in days:
+        entry = store.partitions.get(day)
+        if not entry:
+            continue
+        for rec in read_archive_partition(store.root / entry["file"]):
+            item_id = str(rec["id"])
+            # Older copies of records that moved to a later day are skipped.
+            if store.index.get(item_id) == day:
+                out[item_id] = ArchiveRecord.from_dict(rec)
+    return out
+
+
+def load_archive_since(store: ArchiveStore, since_day: str) -> dict[str, dict[str, Any]]:
+    return load_archive_partitions(store, [day for day in sorted(store.partitions) if day >= since_day])
+
+
+def load_archive_records(store: ArchiveStore, ids: set[str]) -> dict[str, dict[str, Any]]:
+    days = sorted({store.index[i] for i in ids if i in store.index})
+    loaded = load_archive_partitions(store, days)
+    return {i: rec for i, rec in loaded.items() if i in ids}
+
+
+def save_archive_records(store: ArchiveStore, records: dict[str, dict[str, Any]], now: datetime) -> None:
+    """Upsert records into the partitions of their last_seen_at day.
+
+    A record that moved to a newer day leaves its older copy behind; the index
+    points at the live copy and `compact_archive_store` drops the stale ones.
+    """
+    by_day: dict[str, dict[str, dict[str, Any]]] = {}
+    for item_id, record in records.items():
+        by_day.setdefault(archive_partition_day(record, now), {})[item_id] = record
+
+    for day, day_records in by_day.items():
+        if day in store.partitions:
+            merged = load_archive_partitions(store, [day])
+            merged.update(day_records)
+        else:
+            merged = day_records
+        for item_id in day_records:
+            store.index[item_id] = day
+        write_archive_partition(store, day, list(merged.values()))
+
+
+def prune_archive_store(store: ArchiveStore, keep_after: datetime) -> int:
+    cutoff_day = keep_after.date().isoformat()
+    expired = [day for day in store.partitions if day < cutoff_day]
+    for day in expired:
+        (store.root / store.partitions.pop(day)["file"]).unlink(missing_ok=True)
+    before = len(store.index)
+    store.index = {k: v for k, v in store.index.items() if v >= cutoff_day}
+    return before - len(store.index)
+
+
+def compact_archive_store(store: ArchiveStore) -> int:
+    dropped = 0
+    for day in sorted(store.partitions):
+        path = store.root / store.partitions[day]["file"]
+        records = read_archive_partition(path)
+        live = {str(r["id"]): r for r in records if store.index.get(str(r["id"])) == day}
+        if len(live) == len(records):
+            continue
+        dropped += len(records) - len(live)
+        if live:
+            write_archive_partition(store, day, list(live.values()))
+        else:
+            path.unlink(missing_ok=True)
+            store.partitions.pop(day)
+    return dropped
+
+
+# Columnar snapshot of the archive: one .npy per column, all memory-mappable
+# (no pickled objects). Strings live in a UTF-8 heap addressed by offsets.
+COLUMNAR_SNAPSHOT_VERSION = 1
+COLUMNAR_EPOCH_COLUMNS = ("published_ts", "first_seen_ts", "last_seen_ts", "event_ts")
+COLUMNAR_CATEGORY_COLUMNS = ("site_id", "source")
+COLUMNAR_STRING_COLUMNS = ("id", "site_name", "title", "url")
+
+
+@dataclass
+class ColumnarSnapshot:
+    # column name -> ndarray; epochs are float64 with NaN for missing values,
+    # "<cat>_code" are int32 codes into categories[<cat>], "<str>_heap"/"<str>_offsets"
+    # hold the strings of each row.
+    columns: dict[str, Any]
+    categories: dict[str, list[str]]
+
+    def __len__(self) -> int:
+        return int(self.columns["event_ts"].shape[0])
+
+
+def encode_string_column(values: list[str]) -> tuple[Any, Any]:
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def build_columnar_snapshot(records: list[Mapping[str, Any]]) -> ColumnarSnapshot:
+    if np is None:
+        raise RuntimeError("numpy is required for the columnar snapshot")
+    records = sorted(records, key=lambda r: str(r["id"]))
+    columns: dict[str, Any] = {}
+    for name in COLUMNAR_EPOCH_COLUMNS:
+        getter = event_ts if name == "event_ts" else (lambda r, k=name: r.get(k))
+        columns[name] = np.array(
+            [np.nan if (ts := getter(r)) is None else ts for r in records],
+            dtype=np.float64,
+        )
+    categories: dict[str, list[str]] = {}
+    for name in COLUMNAR_CATEGORY_COLUMNS:
+        values = [str(r.get(name) or "") for r in records]
+        categories[name] = sorted(set(values))
+        code_of = {v: i for i, v in enumerate(categories[name])}
+        columns[f"{name}_code"] = np.array([code_of[v] for v in values], dtype=np.int32)
+    for name in COLUMNAR_STRING_COLUMNS:
+        columns[f"{name}_heap"], columns[f"{name}_offsets"] = encode_string_column(
+            [str(r.get(name) or "") for r in records]
+        )
+    return ColumnarSnapshot(columns=columns, categories=categories)
+
+
+def write_columnar_snapshot(root: Path, snapshot: ColumnarSnapshot, now: datetime) -> int:
+    """Write each column as <name>.npy and meta.json last; returns the number of changed files."""
+    root.mkdir(parents=True, exist_ok=True)
+    changed = 0
+    for name, array in snapshot.columns.items():
+        buf = io.BytesIO()
+        np.save(buf, array, allow_pickle=False)
+        changed += translation.write_bytes_if_changed(root / f"{name}.npy", buf.getvalue())
+    meta = {
+        "version": COLUMNAR_SNAPSHOT_VERSION,
+        "generated_at": iso(now),
+        "rows": len(snapshot),
+        "columns": sorted(snapshot.columns),
+        "categories": snapshot.categories,
+    }
+    changed += write_json_if_changed(root / "meta.json", meta)
+    return changed
+
+
+def load_columnar_snapshot(root: Path, mmap: bool = True) -> ColumnarSnapshot | None:
+    if np is None:
+        return None
+    try:
+        meta = json.loads((root / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != COLUMNAR_SNAPSHOT_VERSION:
+            return None
+        columns = {
+            name: np.load(root / f"{name}.npy", mmap_mode="r" if mmap else None, allow_pickle=False)
+            for name in meta["columns"]
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+    return ColumnarSnapshot(columns=columns, categories=meta.get("categories") or {})
+
+
+def columnar_string(snapshot: ColumnarSnapshot, name: str, row: int) -> str:
+    offsets = snapshot.columns[f"{name}_offsets"]
+    return bytes(snapshot.columns[f"{name}_heap"][offsets[row] : offsets[row + 1]]).decode("utf-8")
+
+
+def columnar_window_mask(snapshot: ColumnarSnapshot, start_ts: float, end_ts: float | None = None) -> Any:
+    ts = snapshot.columns["event_ts"]
+    # NaN compares False, so records without an event time never enter a window.
+    mask = ts >= start_ts
+    if end_ts is not None:
+        mask &= ts < end_ts
+    return mask
+
+
+def columnar_retention_mask(snapshot: ColumnarSnapshot, keep_after_ts: float) -> Any:
+    """Rows prune_archive_store would keep: last seen on or after the cutoff day."""
+    cutoff = datetime.fromtimestamp(keep_after_ts, tz=UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    return snapshot.columns["last_seen_ts"] >= cutoff.timestamp()
+
+
+def columnar_site_counts(snapshot: ColumnarSnapshot, mask: Any | None = None) -> dict[str, int]:
+    codes = snapshot.columns["site_id_code"]
+    if mask is not None:
+        codes = codes[mask]
+    sites = snapshot.categories["site_id"]
+    counts = np.bincount(codes, minlength=len(sites))
+    return {sites[i]: int(n) for i, n in enumerate(counts) if n}
 
 
 AI_KEYWORDS = [
@@ -1791,8 +2337,29 @@ COMMERCE_NOISE_KEYWORDS = [
     "首发价",
 ]
 
+EN_SIGNAL_KEYWORDS = [
+    "ai",
+    "aigc",
+    "llm",
+    "gpt",
+    "openai",
+    "anthropic",
+    "deepseek",
+    "gemini",
+    "claude",
+    "robot",
+    "robotics",
+    "embodied",
+    "autonomous",
+    "machine learning",
+    "artificial intelligence",
+    "transformer",
+    "diffusion",
+    "agent",
+]
+
 EN_SIGNAL_RE = re.compile(
-    r"(?i)(?<![a-z0-9])(ai|aigc|llm|gpt|openai|anthropic|deepseek|gemini|claude|robot|robotics|embodied|autonomous|machine learning|artificial intelligence|transformer|diffusion|agent)(?![a-z0-9])"
+    r"(?i)(?<![a-z0-9])(" + "|".join(re.escape(k) for k in EN_SIGNAL_KEYWORDS) + r")(?![a-z0-9])"
 )
 
 TOPHUB_ALLOW_KEYWORDS = [
@@ -1837,15 +2404,15 @@ def has_mojibake_noise(text: str) -> bool:
     return bool(re.search(r"(Ã|Â|â€|æ·|�)", text))
 
 
-def normalize_source_for_display(site_id: str, source: str, url: str) -> str:
+def normalize_source_for_display(site_id: str, source: str, url: str, host: str | None = None) -> str:
     src = (source or "").strip()
     if not src:
-        host = host_of_url(url)
+        host = host_of_url(url) if host is None else host
         if host.startswith("www."):
             host = host[4:]
         return host or "未分区"
     if site_id == "buzzing" and src.lower() == "buzzing":
-        host = host_of_url(url)
+        host = host_of_url(url) if host is None else host
         if host.startswith("www."):
             host = host[4:]
         return host or src
@@ -1893,163 +2460,989 @@ def is_ai_related_record(record: dict[str, Any]) -> bool:
     return True
 
 
-def load_title_zh_cache(path: Path) -> dict[str, str]:
-    if not path.exists():
-        return {}
-    try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-        if isinstance(data, dict):
-            return {str(k): str(v) for k, v in data.items() if str(k).strip() and str(v).strip()}
-    except Exception:
-        pass
-    return {}
+# Bump the revision when maybe_fix_mojibake, normalize_source_for_display, the
+# placeholder checks or title_language change; keyword list edits are picked up
+# through the digest.
+NORMALIZATION_RULES_REVISION = 1
+NORMALIZATION_RULES_VERSION = "{}-{}".format(
+    NORMALIZATION_RULES_REVISION,
+    hashlib.sha1(
+        json.dumps(
+            [
+                AI_KEYWORDS,
+                TECH_KEYWORDS,
+                NOISE_KEYWORDS,
+                COMMERCE_NOISE_KEYWORDS,
+                EN_SIGNAL_KEYWORDS,
+                TOPHUB_ALLOW_KEYWORDS,
+                TOPHUB_BLOCK_KEYWORDS,
+            ],
+            ensure_ascii=False,
+        ).encode("utf-8")
+    ).hexdigest()[:8],
+)
 
 
-def translate_to_zh_cn(session: requests.Session, text: str) -> str | None:
-    s = (text or "").strip()
-    if not s:
-        return None
+def needs_normalization(record: Mapping[str, Any]) -> bool:
+    return record.get("rules_version") != NORMALIZATION_RULES_VERSION
+
+
+def normalize_record(record: ArchiveRecord) -> ArchiveRecord:
+    """Store display title/source, placeholder and topic flags and title language on the record."""
+    site_id = str(record.get("site_id") or "")
+    if record.get("host") is None:
+        record["host"] = host_of_url(record_url(record))
+    title = maybe_fix_mojibake(str(record.get("title") or ""))
+    source = maybe_fix_mojibake(normalize_source_for_display(
+        site_id,
+        str(record.get("source") or ""),
+        str(record.get("url") or ""),
+        record["host"],
+    ))
+    record["display_title"] = title
+    record["display_source"] = source
+    record["placeholder"] = site_id == "aihubtoday" and is_hubtoday_placeholder_title(title)
+    record["topic_ai"] = is_ai_related_record(RecordView(record, {"title": title, "source": source}))
+    record["title_lang"] = title_language(title)
+    record["rules_version"] = NORMALIZATION_RULES_VERSION
+    return record
+
+
+def item_title_language(item: Mapping[str, Any], title: str) -> str:
+    # Normalized records carry the language of their display title.
+    if item.get("title_lang") is not None and item.get("display_title") == title:
+        return item["title_lang"]
+    return title_language(title)
+
+
+ZH_TITLE_INDEX_VERSION = 1
+
+
+@dataclass
+class ZhTitleIndex:
+    # canonical URL -> [Chinese display title, id of the archive record it came from].
+    titles: dict[str, list[str]]
+
+
+def load_zh_title_index(path: Path) -> ZhTitleIndex:
     try:
-        r = session.get(
-            "https://translate.googleapis.com/translate_a/single",
-            params={
-                "client": "gtx",
-                "sl": "auto",
-                "tl": "zh-CN",
-                "dt": "t",
-                "q": s,
-            },
-            timeout=12,
-        )
-        r.raise_for_status()
-        payload = r.json()
-        if not isinstance(payload, list) or not payload:
-            return None
-        segs = payload[0]
-        if not isinstance(segs, list):
-            return None
-        translated = "".join(str(seg[0]) for seg in segs if isinstance(seg, list) and seg and seg[0])
-        translated = translated.strip()
-        if translated and translated != s:
-            return translated
-    except Exception:
-        return None
-    return None
+        data = json.loads(gzip.decompress(path.read_bytes()).decode("utf-8"))
+    except (OSError, EOFError, ValueError):
+        return ZhTitleIndex(titles={})
+    if not isinstance(data, dict) or data.get("version") != ZH_TITLE_INDEX_VERSION:
+        return ZhTitleIndex(titles={})
+    titles = data.get("titles")
+    return ZhTitleIndex(
+        titles={
+            str(url): [str(entry[0]), str(entry[1])]
+            for url, entry in (titles.items() if isinstance(titles, dict) else [])
+            if isinstance(entry, list) and len(entry) == 2
+        }
+    )
+
+
+def update_zh_title_index(index: ZhTitleIndex, records: Iterable[Mapping[str, Any]]) -> int:
+    """Record the Chinese display title of each normalized record by URL; returns entries changed."""
+    changed = 0
+    for record in records:
+        if record["title_lang"] != "zh" or record["placeholder"] or needs_normalization(record):
+            continue
+        entry = [record["display_title"], str(record["id"])]
+        url = record_url(record)
+        if url and index.titles.get(url) != entry:
+            index.titles[url] = entry
+            changed += 1
+    return changed
+
+
+def save_zh_title_index(path: Path, index: ZhTitleIndex, live_ids: Mapping[str, Any]) -> bool:
+    """Drop titles whose record left the archive, then write if changed."""
+    index.titles = {url: entry for url, entry in index.titles.items() if entry[1] in live_ids}
+    data = {"version": ZH_TITLE_INDEX_VERSION, "titles": index.titles}
+    return translation.write_bytes_if_changed(
+        path,
+        gzip.compress(json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8"), mtime=0),
+    )
 
 
 def add_bilingual_fields(
     items_ai: list[dict[str, Any]],
     items_all: list[dict[str, Any]],
     session: requests.Session,
-    cache: dict[str, str],
+    cache: translation.TitleCache | dict[str, str],
     max_new_translations: int,
-) -> tuple[list[dict[str, Any]], list[dict[str, Any]], dict[str, str]]:
+    popularity: Mapping[str, int] | None = None,
+    zh_index: ZhTitleIndex | None = None,
+    workers: int = translation.TRANSLATE_WORKERS,
+    endpoint: str = translation.TRANSLATE_ENDPOINT,
+    rate: float = translation.TRANSLATE_MAX_RPS,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], translation.TitleCache | dict[str, str]]:
+    """Attach title_original/title_en/title_zh/title_bilingual.
+
+    A Chinese title seen for the same URL, in this window or earlier in the
+    archive (zh_index), is used before the translation cache. Up to
+    max_new_translations uncached English AI titles are translated, the ones
+    reported by the most sources (popularity: id -> copies) and then the
+    newest first.
+    """
     zh_by_url: dict[str, str] = {}
     for it in items_all:
         title = str(it.get("title") or "").strip()
-        url = normalize_url(str(it.get("url") or ""))
-        if title and url and has_cjk(title):
+        url = record_url(it)
+        if title and url and item_title_language(it, title) == "zh":
             zh_by_url[url] = title
+    archive_hits: set[str] = set()
+    if zh_index is not None:
+        for it in items_all:
+            url = record_url(it)
+            entry = zh_index.titles.get(url)
+            if entry and url not in zh_by_url:
+                zh_by_url[url] = entry[0]
+                archive_hits.add(url)
+
+    # title -> (copies, event time) of its most important item
+    wanted: dict[str, tuple[int, float]] = {}
+    from_archive: set[str] = set()
+    for it in items_ai:
+        title = str(it.get("title") or "").strip()
+        if item_title_language(it, title) != "en":
+            continue
+        if record_url(it) in zh_by_url:
+            if record_url(it) in archive_hits:
+                from_archive.add(title)
+            continue
+        rank = ((popularity or {}).get(str(it.get("id") or ""), 1), event_sort_key(it))
+        if rank > wanted.get(title, (0, MISSING_TS)):
+            wanted[title] = rank
+    translation.STATS.url_index_hits += len(from_archive)
+    zh_by_title = translation.translate_cached(
+        session,
+        sorted(wanted, key=lambda t: wanted[t], reverse=True),
+        cache,
+        max_new=max_new_translations,
+        workers=workers,
+        endpoint=endpoint,
+        rate=rate,
+    )
 
-    translated_now = 0
-
-    def enrich(item: dict[str, Any], allow_translate: bool) -> dict[str, Any]:
-        nonlocal translated_now
-        out = dict(item)
-        title = str(out.get("title") or "").strip()
-        url = normalize_url(str(out.get("url") or ""))
+    def enrich(item: Mapping[str, Any]) -> RecordView:
+        title = str(item.get("title") or "").strip()
+        out: dict[str, Any] = {}
 
         out["title_original"] = title
         out["title_en"] = None
         out["title_zh"] = None
         out["title_bilingual"] = title
 
-        if has_cjk(title):
+        lang = item_title_language(item, title)
+        if lang == "zh":
             out["title_zh"] = title
-            return out
+            return RecordView(item, out)
 
-        if not is_mostly_english(title):
-            return out
+        if lang != "en":
+            return RecordView(item, out)
 
         out["title_en"] = title
-
-        zh_title = zh_by_url.get(url)
-        if not zh_title:
-            zh_title = cache.get(title)
-        if not zh_title and allow_translate and translated_now < max_new_translations:
-            tr = translate_to_zh_cn(session, title)
-            if tr and has_cjk(tr):
-                zh_title = tr
-                cache[title] = tr
-                translated_now += 1
-
+        zh_title = zh_by_url.get(record_url(item)) or zh_by_title.get(title) or cache.get(title)
         if zh_title:
             out["title_zh"] = zh_title
             out["title_bilingual"] = f"{zh_title} / {title}"
-        return out
+        return RecordView(item, out)
 
-    ai_out = [enrich(it, allow_translate=True) for it in items_ai]
-    all_out = [enrich(it, allow_translate=False) for it in items_all]
+    ai_out = [enrich(it) for it in items_ai]
+    all_out = [enrich(it) for it in items_all]
     return ai_out, all_out, cache
 
 
-def dedupe_items_by_title_url(items: list[dict[str, Any]], random_pick: bool = True) -> list[dict[str, Any]]:
-    groups: dict[str, list[dict[str, Any]]] = {}
+def dedup_key(item: Mapping[str, Any]) -> str:
+    site_id = str(item.get("site_id") or "").strip().lower()
+    title = str(item.get("title_original") or item.get("title") or "").strip().lower()
+    url = record_url(item)
+    if site_id == "aihubtoday":
+        return f"url::{url}"
+    return f"{title}||{url}"
+
+
+def dedupe_items_by_title_url(items: list[Mapping[str, Any]]) -> list[Mapping[str, Any]]:
+    """Keep one item per title+URL group: the newest, ties broken by the larger id.
+
+    The pick depends only on the group's members, so it is the same on every run.
+    """
+    groups: dict[str, list[Mapping[str, Any]]] = {}
     for item in items:
-        site_id = str(item.get("site_id") or "").strip().lower()
-        title = str(item.get("title_original") or item.get("title") or "").strip().lower()
-        url = normalize_url(str(item.get("url") or ""))
-        if site_id == "aihubtoday":
-            key = f"url::{url}"
-        else:
-            key = f"{title}||{url}"
-        groups.setdefault(key, []).append(item)
+        groups.setdefault(dedup_key(item), []).append(item)
 
-    out: list[dict[str, Any]] = []
-    for values in groups.values():
-        if random_pick:
-            out.append(random.choice(values))
+    out = [max(values, key=lambda x: (event_sort_key(x), str(x.get("id") or ""))) for values in groups.values()]
+    out.sort(key=event_sort_key, reverse=True)
+    return out
+
+
+# Near-duplicate clustering: MinHash over title character shingles, with an
+# LSH index of NEAR_DUP_BANDS bands of NEAR_DUP_ROWS values each. One 64-byte
+# BLAKE2b digest per shingle yields all 32 16-bit hash values at once.
+NEAR_DUP_SHINGLE = 3
+NEAR_DUP_BANDS = 8
+NEAR_DUP_ROWS = 4
+NEAR_DUP_THRESHOLD = 0.6
+
+
+def title_shingles(title: str) -> frozenset[str]:
+    text = re.sub(r"[\W_]+", " ", (title or "").lower()).strip()
+    if len(text) <= NEAR_DUP_SHINGLE:
+        return frozenset({text}) if text else frozenset()
+    return frozenset(text[i : i + NEAR_DUP_SHINGLE] for i in range(len(text) - NEAR_DUP_SHINGLE + 1))
+
+
+def minhash_signature(shingles: frozenset[str], digests: dict[str, bytes] | None = None) -> tuple[int, ...]:
+    """32 16-bit MinHash values; `digests` memoizes shingle digests across titles."""
+    if digests is None:
+        digests = {}
+    parts = []
+    for s in shingles:
+        d = digests.get(s)
+        if d is None:
+            d = digests[s] = hashlib.blake2b(s.encode("utf-8"), digest_size=64).digest()
+        parts.append(d)
+    data = b"".join(parts)
+    values = struct.unpack(f"<{len(data) // 2}H", data)
+    k = NEAR_DUP_BANDS * NEAR_DUP_ROWS
+    return tuple([min(values[i::k]) for i in range(k)])
+
+
+def cluster_near_duplicates(items: list[Mapping[str, Any]]) -> dict[str, str]:
+    """Map item id -> cluster id for items whose titles are near duplicates.
+
+    Candidates come from shared LSH band buckets and are confirmed by the
+    exact shingle Jaccard similarity. The cluster id is the id of the earliest
+    member, so it stays put as later copies of a story arrive.
+    """
+    parent = list(range(len(items)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    titles = [str(it.get("title_original") or it.get("title") or "") for it in items]
+    shingles = [title_shingles(t) for t in titles]
+    # Titles that differ in a number ("GPT-4" vs "GPT-5", issue numbers) are
+    # different stories however similar the rest is.
+    numbers = [frozenset(re.findall(r"\d+", t)) for t in titles]
+    buckets: dict[tuple[int, tuple[int, ...]], list[int]] = {}
+    digests: dict[str, bytes] = {}
+    for i, sh in enumerate(shingles):
+        if not sh:
+            continue
+        sig = minhash_signature(sh, digests)
+        for band in range(NEAR_DUP_BANDS):
+            key = (band, sig[band * NEAR_DUP_ROWS : (band + 1) * NEAR_DUP_ROWS])
+            members = buckets.setdefault(key, [])
+            joined = False
+            for j in members:
+                ri, rj = find(i), find(j)
+                if ri == rj:
+                    joined = True
+                    continue
+                other = shingles[j]
+                if numbers[i] == numbers[j] and len(sh & other) >= NEAR_DUP_THRESHOLD * len(sh | other):
+                    parent[max(ri, rj)] = min(ri, rj)
+                    joined = True
+            # A bucket keeps one member per cluster, so identical titles do not
+            # turn it into a quadratic scan.
+            if not joined:
+                members.append(i)
+
+    earliest: dict[int, Mapping[str, Any]] = {}
+    for i, it in enumerate(items):
+        root = find(i)
+        best = earliest.get(root)
+        if best is None or (event_sort_key(it), str(it.get("id") or "")) < (event_sort_key(best), str(best.get("id") or "")):
+            earliest[root] = it
+    return {str(it.get("id") or ""): str(earliest[find(i)].get("id") or "") for i, it in enumerate(items)}
+
+
+def parse_window_hours(value: str) -> list[int]:
+    hours = sorted({int(x) for x in str(value or "").split(",") if x.strip()})
+    if any(h <= 0 for h in hours):
+        raise argparse.ArgumentTypeError("window hours must be positive")
+    return hours
+
+
+def window_view_filename(hours: int) -> str:
+    return f"latest-{hours}h.json"
+
+
+def build_event_index(records: list[Mapping[str, Any]]) -> tuple[list[Mapping[str, Any]], list[float]]:
+    """Sort records newest-first and return them with ascending negated event keys for bisect."""
+    ordered = sorted(records, key=event_sort_key, reverse=True)
+    return ordered, [-event_sort_key(r) for r in ordered]
+
+
+def window_slice(
+    index: tuple[list[Mapping[str, Any]], list[float]],
+    start_ts: float,
+) -> list[Mapping[str, Any]]:
+    ordered, neg_keys = index
+    return ordered[: bisect.bisect_right(neg_keys, -start_ts)]
+
+
+def build_window_view(
+    items_all: list[Mapping[str, Any]],
+    ai_ids: set[str],
+    clusters: dict[str, str],
+    statuses: list[dict[str, Any]],
+    window_hours: int,
+    now: datetime,
+    archive_total: int,
+) -> tuple[dict[str, Any], list[Mapping[str, Any]], list[Mapping[str, Any]], list[Mapping[str, Any]], list[Mapping[str, Any]]]:
+    """Filter, dedupe and count one window cut from the enriched, newest-first items.
+
+    Returns (meta, items_ai, items_ai_dedup, items_all, items_all_dedup).
+    """
+    items_all = normalize_aihubtoday_records(list(items_all))
+    # Clusters come from the widest window; in this one a cluster is named after
+    # its earliest member present here and counts only the members present here.
+    members: dict[str, list[Mapping[str, Any]]] = {}
+    for record in items_all:
+        members.setdefault(clusters.get(str(record["id"]), str(record["id"])), []).append(record)
+    window_clusters: dict[str, dict[str, Any]] = {}
+    for group in members.values():
+        first = min(group, key=lambda r: (event_sort_key(r), str(r["id"])))
+        for record in group:
+            window_clusters[str(record["id"])] = {"cluster_id": str(first["id"]), "cluster_size": len(group)}
+    items_all = [RecordView(record, window_clusters[str(record["id"])]) for record in items_all]
+    items_ai = [record for record in items_all if str(record["id"]) in ai_ids]
+    items_ai_dedup = dedupe_items_by_title_url(items_ai)
+    items_all_dedup = dedupe_items_by_title_url(items_all)
+
+    # site stats
+    site_stat: dict[str, dict[str, Any]] = {}
+    raw_count_by_site: dict[str, int] = {}
+    for record in items_all:
+        sid = record["site_id"]
+        raw_count_by_site[sid] = raw_count_by_site.get(sid, 0) + 1
+
+    site_name_by_id: dict[str, str] = {}
+    for record in items_all:
+        site_name_by_id[record["site_id"]] = record["site_name"]
+    for s in statuses:
+        sid = s["site_id"]
+        if sid not in site_name_by_id:
+            site_name_by_id[sid] = s.get("site_name") or sid
+
+    for record in items_ai_dedup:
+        sid = record["site_id"]
+        if sid not in site_stat:
+            site_stat[sid] = {
+                "site_id": sid,
+                "site_name": record["site_name"],
+                "count": 0,
+                "raw_count": raw_count_by_site.get(sid, 0),
+            }
+        site_stat[sid]["count"] += 1
+
+    for sid, site_name in site_name_by_id.items():
+        if sid in site_stat:
+            continue
+        site_stat[sid] = {
+            "site_id": sid,
+            "site_name": site_name,
+            "count": 0,
+            "raw_count": raw_count_by_site.get(sid, 0),
+        }
+
+    meta = {
+        "generated_at": iso(now),
+        "window_hours": window_hours,
+        "total_items": len(items_ai_dedup),
+        "total_items_ai_raw": len(items_ai),
+        "total_items_raw": len(items_all),
+        "total_items_all_mode": len(items_all_dedup),
+        "topic_filter": "ai_tech_robotics",
+        "archive_total": archive_total,
+        "site_count": len(site_stat),
+        "source_count": len({f"{i['site_id']}::{i['source']}" for i in items_ai_dedup}),
+        "site_stats": sorted(site_stat.values(), key=lambda x: x["count"], reverse=True),
+    }
+    return meta, items_ai, items_ai_dedup, items_all, items_all_dedup
+
+
+def render_latest_payload(
+    meta: dict[str, Any],
+    items_ai_dedup: list[Mapping[str, Any]],
+    items_all: list[Mapping[str, Any]],
+    items_all_dedup: list[Mapping[str, Any]],
+    payload_version: int,
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Return (compact v2 payload with generation, payload to write in the requested version)."""
+    compact = compact_latest_payload(meta, items_ai_dedup, items_all, items_all_dedup)
+    compact["generation"] = latest_generation(compact)
+    if payload_version == LATEST_PAYLOAD_VERSION:
+        return compact, compact
+    items_ai_out = [public_record(r) for r in items_ai_dedup]
+    return compact, {
+        **meta,
+        "items": items_ai_out,
+        "items_ai": items_ai_out,
+        "items_all_raw": [public_record(r) for r in items_all],
+        "items_all": [public_record(r) for r in items_all_dedup],
+    }
+
+
+EMAIL_DIGEST_VERSION = 1
+EMAIL_DIGEST_FIELDS: tuple[str, ...] = (
+    "id",
+    "site_id",
+    "site_name",
+    "source",
+    "title",
+    "url",
+    "published_at",
+    "title_en",
+    "title_zh",
+    "cluster_size",
+)
+
+
+def build_email_digest(meta: Mapping[str, Any], items_ai: list[Mapping[str, Any]], limit: int) -> dict[str, Any]:
+    """The first `limit` deduped AI items of the main window, with their translations, for send_email.py."""
+    return {
+        "digest_version": EMAIL_DIGEST_VERSION,
+        "generated_at": meta["generated_at"],
+        "window_hours": meta["window_hours"],
+        "total_items": meta["total_items"],
+        "items": [{field: item.get(field) for field in EMAIL_DIGEST_FIELDS} for item in items_ai[:limit]],
+    }
+
+
+LATEST_PAYLOAD_VERSION = 2
+# Columns of the v2 item table. title_original/title_bilingual are derived when expanding.
+LATEST_ITEM_FIELDS: tuple[str, ...] = (
+    "id",
+    "site_id",
+    "site_name",
+    "source",
+    "title",
+    "url",
+    "published_at",
+    "first_seen_at",
+    "title_en",
+    "title_zh",
+    "cluster_id",
+    "cluster_size",
+)
+LATEST_VIEWS: tuple[str, ...] = ("items_ai", "items_all_raw", "items_all")
+
+
+def compact_latest_payload(
+    meta: dict[str, Any],
+    items_ai: list[Mapping[str, Any]],
+    items_all_raw: list[Mapping[str, Any]],
+    items_all: list[Mapping[str, Any]],
+) -> dict[str, Any]:
+    """Build the v2 latest payload: one item table plus per-view row indexes."""
+    ai_by_id = {str(it["id"]): it for it in items_ai}
+    table: list[list[Any]] = []
+    row_of: dict[str, int] = {}
+
+    def row(item: Mapping[str, Any]) -> int:
+        item_id = str(item["id"])
+        idx = row_of.get(item_id)
+        if idx is None:
+            src = ai_by_id.get(item_id, item)
+            idx = row_of[item_id] = len(table)
+            table.append([src.get(f) for f in LATEST_ITEM_FIELDS])
+        return idx
+
+    # items_all_raw first, so the table keeps the newest-first event order.
+    views = {
+        "items_all_raw": [row(it) for it in items_all_raw],
+        "items_ai": [row(it) for it in items_ai],
+        "items_all": [row(it) for it in items_all],
+    }
+    return {
+        "payload_version": LATEST_PAYLOAD_VERSION,
+        **meta,
+        "item_fields": list(LATEST_ITEM_FIELDS),
+        "item_table": table,
+        "views": {name: views[name] for name in LATEST_VIEWS},
+    }
+
+
+def expand_latest_item(item: dict[str, Any]) -> dict[str, Any]:
+    title = str(item.get("title") or "").strip()
+    zh = item.get("title_zh")
+    item["title_original"] = title
+    item["title_bilingual"] = f"{zh} / {title}" if item.get("title_en") and zh else title
+    return item
+
+
+def expand_latest_payload(payload: dict[str, Any]) -> dict[str, Any]:
+    """Return a latest payload in the v1 shape (items/items_ai/items_all_raw/items_all)."""
+    if payload.get("payload_version") != LATEST_PAYLOAD_VERSION:
+        return payload
+    fields = payload.get("item_fields") or []
+    items = [expand_latest_item(dict(zip(fields, row))) for row in payload.get("item_table") or []]
+    out = {k: v for k, v in payload.items() if k not in {"item_fields", "item_table", "views"}}
+    views = payload.get("views") or {}
+    for name in LATEST_VIEWS:
+        out[name] = [items[i] for i in views.get(name) or []]
+    out["items"] = out["items_ai"]
+    return out
+
+
+LATEST_DELTA_KEEP = 8
+
+
+def latest_generation(payload: dict[str, Any]) -> str:
+    return output_content_hash({k: v for k, v in payload.items() if k != "generation"})[:16]
+
+
+def load_latest_compact(path: Path) -> dict[str, Any] | None:
+    """Read a previous latest-24h.json (either version) as a v2 payload with its generation."""
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    if payload.get("payload_version") != LATEST_PAYLOAD_VERSION:
+        meta = {k: v for k, v in payload.items() if not k.startswith("items")}
+        payload = compact_latest_payload(
+            meta,
+            payload.get("items_ai") or payload.get("items") or [],
+            payload.get("items_all_raw") or [],
+            payload.get("items_all") or [],
+        )
+    if "generation" not in payload:
+        payload["generation"] = latest_generation(payload)
+    return payload
+
+
+LATEST_DELTA_VERSION = 2
+
+
+def row_runs(rows: list[int]) -> list[list[int]]:
+    """Run-length encode delta rows: [first, count] steps by +1 over old rows, by -1 over added ones."""
+    runs: list[list[int]] = []
+    for r in rows:
+        if runs:
+            first, count = runs[-1]
+            step = 1 if first >= 0 else -1
+            if (r >= 0) == (first >= 0) and r == first + step * count:
+                runs[-1][1] += 1
+                continue
+        runs.append([r, 1])
+    return runs
+
+
+def expand_row_runs(runs: list[list[int]]) -> list[int]:
+    return [first + (i if first >= 0 else -i) for first, count in runs for i in range(count)]
+
+
+def build_latest_delta(previous: dict[str, Any], payload: dict[str, Any]) -> dict[str, Any] | None:
+    """Describe how to turn the previous v2 payload into the current one.
+
+    `rows` run-length encodes (see row_runs), for every row of the new table, the
+    old row index or -(k+1) for `added[k]`; `changed` holds the new field values of
+    kept rows by item id. Views are sent as the item ids added to and removed
+    from each; this relies on every view listing rows in table order, and None
+    is returned (clients reload in full) when one does not.
+    """
+    fields = list(payload["item_fields"])
+    if list(previous.get("item_fields") or []) != fields:
+        return None
+    if any(rows != sorted(rows) for rows in [*payload["views"].values(), *previous["views"].values()]):
+        return None
+    id_col = fields.index("id")
+    previous_table = previous.get("item_table") or []
+    previous_rows = {row[id_col]: (i, row) for i, row in enumerate(previous_table)}
+
+    rows: list[int] = []
+    added: list[list[Any]] = []
+    changed: dict[str, dict[str, Any]] = {}
+    for row in payload["item_table"]:
+        old = previous_rows.get(row[id_col])
+        if old is None:
+            added.append(row)
+            rows.append(-len(added))
+            continue
+        old_index, old_row = old
+        rows.append(old_index)
+        diff = {f: v for f, v, ov in zip(fields, row, old_row) if v != ov}
+        if diff:
+            changed[row[id_col]] = diff
+    current_ids = {row[id_col] for row in payload["item_table"]}
+
+    views: dict[str, dict[str, list[str]]] = {}
+    for name in LATEST_VIEWS:
+        before = [previous_table[i][id_col] for i in previous["views"].get(name) or []]
+        after = [payload["item_table"][i][id_col] for i in payload["views"].get(name) or []]
+        before_set, after_set = set(before), set(after)
+        views[name] = {
+            "add": [item_id for item_id in after if item_id not in before_set],
+            "remove": [item_id for item_id in before if item_id not in after_set],
+        }
+
+    return {
+        "delta_version": LATEST_DELTA_VERSION,
+        "from_generation": previous["generation"],
+        "to_generation": payload["generation"],
+        "meta": {k: v for k, v in payload.items() if k not in {"item_fields", "item_table", "views"}},
+        "item_fields": fields,
+        "rows": row_runs(rows),
+        "added": added,
+        "removed": [item_id for item_id in previous_rows if item_id not in current_ids],
+        "changed": changed,
+        "views": views,
+    }
+
+
+def apply_latest_delta(previous: dict[str, Any], delta: dict[str, Any]) -> dict[str, Any]:
+    if delta.get("delta_version") != LATEST_DELTA_VERSION:
+        raise ValueError(f"unsupported delta_version: {delta.get('delta_version')!r}")
+    fields = delta["item_fields"]
+    col = {f: i for i, f in enumerate(fields)}
+    table: list[list[Any]] = []
+    for r in expand_row_runs(delta["rows"]):
+        if r < 0:
+            table.append(delta["added"][-r - 1])
+            continue
+        row = list(previous["item_table"][r])
+        for f, v in delta["changed"].get(row[col["id"]], {}).items():
+            row[col[f]] = v
+        table.append(row)
+    row_of = {row[col["id"]]: i for i, row in enumerate(table)}
+    views: dict[str, list[int]] = {}
+    for name, ops in delta["views"].items():
+        removed = set(ops["remove"])
+        ids = [previous["item_table"][i][col["id"]] for i in previous["views"].get(name) or []]
+        ids = [item_id for item_id in ids if item_id not in removed] + ops["add"]
+        views[name] = sorted(row_of[item_id] for item_id in ids)
+    return {**delta["meta"], "item_fields": fields, "item_table": table, "views": views}
+
+
+def update_latest_deltas(
+    shard_dir: Path,
+    previous: dict[str, Any] | None,
+    payload: dict[str, Any],
+) -> list[dict[str, Any]]:
+    """Write the delta from the previous generation and return the manifest's delta chain."""
+    try:
+        chain = json.loads((shard_dir / "manifest.json").read_text(encoding="utf-8")).get("deltas") or []
+    except (OSError, ValueError, AttributeError):
+        chain = []
+    delta_dir = shard_dir / "delta"
+    delta_dir.mkdir(parents=True, exist_ok=True)
+
+    if previous is not None and previous["generation"] != payload["generation"]:
+        delta = build_latest_delta(previous, payload)
+        if delta is None:
+            chain = []
         else:
-            chosen = max(
-                values,
-                key=lambda x: (
-                    event_time(x) or datetime.min.replace(tzinfo=UTC),
-                    str(x.get("id") or ""),
-                ),
+            name = f"delta/{previous['generation']}.json"
+            write_json_if_changed(shard_dir / name, delta)
+            chain = [d for d in chain if d.get("from") != previous["generation"]]
+            chain.append(
+                {"from": previous["generation"], "to": payload["generation"], "file": name, "version": LATEST_DELTA_VERSION}
             )
-            out.append(chosen)
+    # Deltas in an older format are dropped; clients holding those generations reload in full.
+    chain = [d for d in chain if d.get("version") == LATEST_DELTA_VERSION]
+    chain = chain[-LATEST_DELTA_KEEP:]
+
+    keep = {d["file"] for d in chain}
+    for path in delta_dir.glob("*.json"):
+        if f"delta/{path.name}" not in keep:
+            path.unlink()
+    return chain
+
+
+def shard_slug(value: str) -> str:
+    """File name for a site id; the hash suffix keeps ids that slug alike (e.g. "a.b" and "a-b") apart."""
+    slug = re.sub(r"[^a-z0-9_-]+", "-", value.lower()).strip("-") or "site"
+    return f"{slug}-{hashlib.sha1(value.encode('utf-8')).hexdigest()[:8]}"
+
+
+def shard_generation(payload: dict[str, Any]) -> str:
+    return output_content_hash({k: payload[k] for k in ("item_fields", "item_table", "views")})[:16]
+
+
+def build_latest_shards(payload: dict[str, Any], page_size: int) -> tuple[dict[str, Any], dict[str, dict[str, Any]]]:
+    """Split a v2 latest payload into a small manifest plus page and per-site shards.
+
+    Rows keep their global index into the item table (newest first), so a client
+    can merge shards in any order. Shards live under g/<shard_generation>/, a hash
+    of the rows alone: a path never changes content, and a run that only changes
+    the meta (counts, generated_at) reuses the previous directory.
+    Returns (manifest, {relative path: shard}).
+    """
+    table: list[list[Any]] = payload["item_table"]
+    views: dict[str, list[int]] = payload["views"]
+    site_col = LATEST_ITEM_FIELDS.index("site_id")
+    generation = payload.get("generation") or latest_generation(payload)
+    rows_generation = shard_generation(payload)
+    prefix = f"g/{rows_generation}"
+
+    def shard(rows: list[int]) -> dict[str, Any]:
+        member = set(rows)
+        return {
+            "rows": rows,
+            "item_table": [table[i] for i in rows],
+            "views": {name: [i for i in views[name] if i in member] for name in LATEST_VIEWS},
+        }
 
-    out.sort(key=lambda x: event_time(x) or datetime.min.replace(tzinfo=UTC), reverse=True)
-    return out
+    shards: dict[str, dict[str, Any]] = {}
+    pages: list[dict[str, Any]] = []
+    for start in range(0, len(table), max(1, page_size)):
+        rows = list(range(start, min(start + page_size, len(table))))
+        name = f"{prefix}/pages/{len(pages):03d}.json"
+        shards[name] = shard(rows)
+        pages.append({"file": name, "count": len(rows)})
+
+    rows_by_site: dict[str, list[int]] = {}
+    for i, row in enumerate(table):
+        rows_by_site.setdefault(str(row[site_col] or ""), []).append(i)
+    sites: list[dict[str, Any]] = []
+    for site_id, rows in sorted(rows_by_site.items()):
+        name = f"{prefix}/sites/{shard_slug(site_id)}.json"
+        shards[name] = shard(rows)
+        sites.append({"site_id": site_id, "file": name, "count": len(rows)})
+
+    meta = {k: v for k, v in payload.items() if k not in {"item_table", "views"}}
+    manifest = {
+        **meta,
+        "generation": generation,
+        "shard_generation": rows_generation,
+        "page_size": page_size,
+        "view_totals": {name: len(views[name]) for name in LATEST_VIEWS},
+        "pages": pages,
+        "sites": sites,
+    }
+    return manifest, shards
+
+
+def write_latest_shards(shard_dir: Path, manifest: dict[str, Any], shards: dict[str, dict[str, Any]]) -> int:
+    """Write one generation's shards, then the manifest, then prune old generations.
+
+    The previous generation is kept for clients that loaded its manifest before
+    the swap and are still fetching pages.
+    """
+    previous = load_json_object(shard_dir / "manifest.json") or {}
+    written = 0
+    for name, shard in shards.items():
+        (shard_dir / name).parent.mkdir(parents=True, exist_ok=True)
+        written += write_json_if_changed(shard_dir / name, shard)
+    # Manifest last: clients only see it once every shard it names is in place.
+    write_json_if_changed(shard_dir / "manifest.json", manifest)
+    # Manifests written before shard_generation named their directory by generation.
+    keep = {str(manifest["shard_generation"]), str(previous.get("shard_generation") or previous.get("generation") or "")}
+    generations = shard_dir / "g"
+    for path in generations.iterdir() if generations.is_dir() else []:
+        if path.name not in keep:
+            shutil.rmtree(path)
+    # Shards of the layout before generation directories.
+    for sub in ("pages", "sites"):
+        shutil.rmtree(shard_dir / sub, ignore_errors=True)
+    return written
+
+
+GENERATED_AT_RE = re.compile(rb'"generated_at":\s*"([^"]+)"')
+
+
+def read_generated_at(path: Path) -> datetime | None:
+    """generated_at of a JSON output; read from the head of the file so large payloads are not parsed."""
+    try:
+        with path.open("rb") as fh:
+            head = fh.read(4096)
+    except OSError:
+        return None
+    match = GENERATED_AT_RE.search(head)
+    if match:
+        return parse_iso(match.group(1).decode("utf-8", "replace"))
+    data = load_json_object(path)
+    return parse_iso(data.get("generated_at")) if data is not None else None
+
+
+def load_json_object(path: Path) -> dict[str, Any] | None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def load_source_status(path: Path) -> dict[str, Any] | None:
+    data = load_json_object(path)
+    return data if data is not None and isinstance(data.get("sites"), list) else None
+
+
+def source_health(status: Mapping[str, Any]) -> float:
+    """Share of sites in a source-status payload that fetched without error."""
+    sites = status.get("sites") or []
+    return sum(1 for s in sites if s.get("ok")) / len(sites) if sites else 0.0
+
+
+def check_freshness(
+    latest_path: Path,
+    status: Mapping[str, Any] | None,
+    now: datetime,
+    max_age_minutes: float,
+    min_health: float,
+) -> tuple[bool, str]:
+    """Whether the last run's outputs are recent and healthy enough to skip this run, and why.
+
+    Age is taken from the newer generated_at of latest-24h.json and the source
+    status (the former is not rewritten when its content is unchanged). Without
+    a status file only the age is checked.
+    """
+    stamps = [read_generated_at(latest_path)]
+    if status is not None:
+        stamps.append(parse_iso(status.get("generated_at")))
+    stamps = [s for s in stamps if s is not None]
+    if not stamps:
+        return False, f"no generated_at in {latest_path}"
+    age = (now - max(stamps)).total_seconds() / 60
+    if age > max_age_minutes:
+        return False, f"outputs are {age:.0f} min old (max {max_age_minutes:g})"
+    if status is None:
+        return True, f"outputs are {age:.0f} min old; no source status, health not checked"
+    health = source_health(status)
+    if health < min_health:
+        return False, f"outputs are {age:.0f} min old but only {health:.0%} of sources succeeded (min {min_health:.0%})"
+    return True, f"outputs are {age:.0f} min old, {health:.0%} of sources succeeded"
+
+
+def merge_source_statuses(previous: list[dict[str, Any]], refreshed: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Previous per-site statuses with the refetched sites replaced in place."""
+    by_id = {s["site_id"]: s for s in refreshed}
+    merged = [by_id.pop(s["site_id"], s) for s in previous]
+    return merged + [s for s in refreshed if s["site_id"] in by_id]
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Aggregate AI news updates from multiple sources")
     parser.add_argument("--output-dir", default="data", help="Directory for output JSON files")
     parser.add_argument("--window-hours", type=int, default=24, help="24h window size")
+    parser.add_argument(
+        "--windows",
+        type=parse_window_hours,
+        default=parse_window_hours("1,6,24,72"),
+        help="Comma-separated window sizes in hours, each written as latest-<N>h.json (default: 1,6,24,72)",
+    )
     parser.add_argument("--archive-days", type=int, default=45, help="Keep archive for N days")
     parser.add_argument("--translate-max-new", type=int, default=80, help="Max new EN->ZH title translations per run")
+    parser.add_argument(
+        "--translate-workers", type=int, default=translation.TRANSLATE_WORKERS, help="Concurrent translation batches"
+    )
+    parser.add_argument(
+        "--translate-rps",
+        type=float,
+        default=translation.TRANSLATE_MAX_RPS,
+        help="Max translation requests per second (0 = unlimited)",
+    )
     parser.add_argument("--rss-opml", default="", help="Optional OPML file path to include RSS sources")
     parser.add_argument("--rss-max-feeds", type=int, default=0, help="Optional max OPML RSS feeds to fetch (0 means all)")
+    parser.add_argument(
+        "--payload-version",
+        type=int,
+        choices=[1, LATEST_PAYLOAD_VERSION],
+        default=LATEST_PAYLOAD_VERSION,
+        help="latest-24h.json layout: 1 = full item lists per view, 2 = item table + view indexes",
+    )
+    parser.add_argument(
+        "--shard-page-size",
+        type=int,
+        default=200,
+        help="Items per time-page shard under <output-dir>/latest-24h/ (0 disables shards)",
+    )
+    parser.add_argument(
+        "--digest-items",
+        type=int,
+        default=200,
+        help="AI items written to <output-dir>/email-digest.json for the email script (0 disables)",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=0,
+        help="Exit without fetching when the outputs are younger than this many minutes and sources are healthy (0 = always run)",
+    )
+    parser.add_argument(
+        "--min-source-health",
+        type=float,
+        default=0.8,
+        help="Share of sources that must have succeeded last run for --max-age to skip (default: 0.8)",
+    )
+    parser.add_argument(
+        "--refresh-failed-only",
+        action="store_true",
+        help="Only refetch the sources that failed in the last source-status.json; other sources keep their status",
+    )
+    parser.add_argument(
+        "--compact-archive",
+        action="store_true",
+        help="Drop stale copies of records that moved between archive partitions, then exit",
+    )
+    parser.add_argument(
+        "--columnar-snapshot",
+        action="store_true",
+        help="Also write a NumPy columnar snapshot of the archive under <output-dir>/archive/columnar/ (needs numpy)",
+    )
     args = parser.parse_args()
 
     now = utc_now()
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    archive_path = output_dir / "archive.json"
+    archive_dir = output_dir / "archive"
+    legacy_archive_path = output_dir / "archive.json"
     latest_path = output_dir / "latest-24h.json"
+    shard_dir = output_dir / "latest-24h"
+    zh_title_index_path = archive_dir / "zh-title-index.json.gz"
     status_path = output_dir / "source-status.json"
     waytoagi_path = output_dir / "waytoagi-7d.json"
-    title_cache_path = output_dir / "title-zh-cache.json"
-
-    archive = load_archive(archive_path)
+    digest_path = output_dir / "email-digest.json"
+    title_cache_dir = output_dir / "title-zh-cache"
+
+    previous_status = load_source_status(status_path)
+    if args.max_age > 0 and not args.compact_archive:
+        fresh, reason = check_freshness(latest_path, previous_status, now, args.max_age, args.min_source_health)
+        print(f"{'Fresh' if fresh else 'Stale'}: {reason}")
+        if fresh:
+            return 0
+    refresh: set[str] | None = None
+    if args.refresh_failed_only:
+        if previous_status is None:
+            print(f"No usable {status_path}; fetching all sources")
+        else:
+            refresh = {str(s["site_id"]) for s in previous_status["sites"] if not s.get("ok")}
+            if not refresh:
+                print("Nothing to refresh: every source succeeded in the last run")
+                return 0
+            print(f"Refreshing failed sources: {', '.join(sorted(refresh))}")
+
+    store = open_archive_store(archive_dir, now, legacy_path=legacy_archive_path)
+    if args.compact_archive:
+        dropped = compact_archive_store(store)
+        write_archive_manifest(store, now)
+        print(f"Compacted: {archive_dir} ({dropped} stale records dropped, {len(store.partitions)} partitions)")
+        return 0
+
+    window_hours_all = sorted(set(args.windows) | {args.window_hours})
+    window_start = now - timedelta(hours=max(window_hours_all))
+    archive = load_archive_since(store, window_start.date().isoformat())
+    previous_latest = load_latest_compact(latest_path)
 
     session = create_session()
-    raw_items, statuses = collect_all(session, now)
+    raw_items, statuses = collect_all(session, now, only=refresh)
     rss_feed_statuses: list[dict[str, Any]] = []
+    if refresh is not None:
+        statuses = merge_source_statuses(previous_status["sites"], statuses)
+        if "opmlrss" not in refresh:
+            rss_feed_statuses = list((previous_status.get("rss_opml") or {}).get("feeds") or [])
 
-    if args.rss_opml:
+    if args.rss_opml and (refresh is None or "opmlrss" in refresh):
         opml_path = Path(args.rss_opml).expanduser()
         if opml_path.exists():
             rss_items, rss_summary_status, rss_feed_statuses = fetch_opml_rss(
@@ -2058,24 +3451,21 @@ def main() -> int:
                 max_feeds=max(0, int(args.rss_max_feeds)),
             )
             raw_items.extend(rss_items)
-            statuses.append(rss_summary_status)
         else:
-            statuses.append(
-                {
-                    "site_id": "opmlrss",
-                    "site_name": "OPML RSS",
-                    "ok": False,
-                    "item_count": 0,
-                    "duration_ms": 0,
-                    "error": f"OPML not found: {opml_path}",
-                    "feed_count": 0,
-                    "ok_feed_count": 0,
-                    "failed_feed_count": 0,
-                }
-            )
-
-    seen_this_run: set[str] = set()
+            rss_summary_status = {
+                "site_id": "opmlrss",
+                "site_name": "OPML RSS",
+                "ok": False,
+                "item_count": 0,
+                "duration_ms": 0,
+                "error": f"OPML not found: {opml_path}",
+                "feed_count": 0,
+                "ok_feed_count": 0,
+                "failed_feed_count": 0,
+            }
+        statuses = merge_source_statuses(statuses, [rss_summary_status])
 
+    candidates: list[tuple[RawItem, str, str, str]] = []
     for raw in raw_items:
         title = raw.title.strip()
         url = normalize_url(raw.url)
@@ -2083,148 +3473,140 @@ def main() -> int:
             continue
         if not url.startswith("http"):
             continue
+        candidates.append((raw, title, url, make_item_id(raw.site_id, raw.source, title, url)))
 
-        item_id = make_item_id(raw.site_id, raw.source, title, url)
-        seen_this_run.add(item_id)
+    # Records last seen before the window live in older partitions; load just those.
+    archive.update(load_archive_records(store, {c[3] for c in candidates if c[3] not in archive}))
 
+    now_iso = iso(now)
+    now_ts = now.timestamp()
+    touched: dict[str, ArchiveRecord] = {}
+    for raw, title, url, item_id in candidates:
         existing = archive.get(item_id)
         if existing is None:
-            archive[item_id] = {
-                "id": item_id,
-                "site_id": raw.site_id,
-                "site_name": raw.site_name,
-                "source": raw.source,
-                "title": title,
-                "url": url,
-                "published_at": iso(raw.published_at),
-                "first_seen_at": iso(now),
-                "last_seen_at": iso(now),
-            }
+            existing = archive[item_id] = ArchiveRecord(
+                id=item_id,
+                site_id=raw.site_id,
+                site_name=raw.site_name,
+                source=raw.source,
+                title=title,
+                url=url,
+                host=host_of_url(url),
+                published_at=iso(raw.published_at),
+                first_seen_at=now_iso,
+                last_seen_at=now_iso,
+                published_ts=raw.published_at.timestamp() if raw.published_at else None,
+                first_seen_ts=now_ts,
+                last_seen_ts=now_ts,
+            )
         else:
+            if (existing["title"], existing["source"], existing["site_name"], existing["url"]) != (
+                title,
+                raw.source,
+                raw.site_name,
+                url,
+            ):
+                existing["rules_version"] = None
             existing["site_id"] = raw.site_id
             existing["site_name"] = raw.site_name
             existing["source"] = raw.source
             existing["title"] = title
-            existing["url"] = url
+            if existing["url"] != url or existing["host"] is None:
+                existing["url"] = url
+                existing["host"] = host_of_url(url)
             if raw.published_at:
                 # OPML RSS may fix previously wrong publish times; allow overwrite.
                 if raw.site_id == "opmlrss" or not existing.get("published_at"):
                     existing["published_at"] = iso(raw.published_at)
-            existing["last_seen_at"] = iso(now)
-
-    # Prune old archive
-    keep_after = now - timedelta(days=args.archive_days)
-    pruned: dict[str, dict[str, Any]] = {}
+                    existing["published_ts"] = raw.published_at.timestamp()
+            existing["last_seen_at"] = now_iso
+            existing["last_seen_ts"] = now_ts
+        existing["event_ts"] = derive_event_ts(existing)
+        touched[item_id] = existing
+
+    # Derived fields are only recomputed for new or changed records and after a
+    # rules change; recomputed window records are saved so the stamp sticks.
+    window_start_ts = window_start.timestamp()
+    renormalized = 0
     for item_id, record in archive.items():
-        ts = (
-            parse_iso(record.get("last_seen_at"))
-            or parse_iso(record.get("published_at"))
-            or parse_iso(record.get("first_seen_at"))
-            or now
-        )
-        if ts >= keep_after:
-            pruned[item_id] = record
-    archive = pruned
-
-    # 24h view
-    window_start = now - timedelta(hours=args.window_hours)
-    latest_items_all: list[dict[str, Any]] = []
-    for record in archive.values():
-        ts = event_time(record)
-        if not ts:
+        if not needs_normalization(record):
             continue
-        if ts >= window_start:
-            normalized = dict(record)
-            normalized["title"] = maybe_fix_mojibake(str(normalized.get("title") or ""))
-            normalized["source"] = maybe_fix_mojibake(normalize_source_for_display(
-                str(normalized.get("site_id") or ""),
-                str(normalized.get("source") or ""),
-                str(normalized.get("url") or ""),
-            ))
-            if str(normalized.get("site_id") or "") == "aihubtoday" and is_hubtoday_placeholder_title(
-                str(normalized.get("title") or "")
-            ):
+        if item_id not in touched:
+            ts = record["event_ts"]
+            if ts is None or ts < window_start_ts:
                 continue
-            latest_items_all.append(normalized)
+            touched[item_id] = record
+        normalize_record(record)
+        renormalized += 1
+
+    # Chinese titles by URL, kept for the whole archive; a new index is seeded
+    # from the records loaded this run.
+    zh_index = load_zh_title_index(zh_title_index_path)
+    update_zh_title_index(zh_index, archive.values() if not zh_index.titles else touched.values())
 
-    latest_items_all = normalize_aihubtoday_records(latest_items_all)
+    # Prune old archive: whole partitions past retention are dropped.
+    keep_after = now - timedelta(days=args.archive_days)
+    prune_archive_store(store, keep_after)
+    save_archive_records(store, touched, now)
+    archive = {item_id: record for item_id, record in archive.items() if item_id in store.index}
 
-    latest_items_all.sort(key=lambda x: event_time(x) or datetime.min.replace(tzinfo=UTC), reverse=True)
-    latest_items = [record for record in latest_items_all if is_ai_related_record(record)]
-    title_cache = load_title_zh_cache(title_cache_path)
+    # Widest window once; narrower windows are cut from its event-time index below.
+    latest_items_all: list[Mapping[str, Any]] = []
+    for record in archive.values():
+        ts = record["event_ts"]
+        if ts is None:
+            continue
+        if ts >= window_start_ts and not record["placeholder"]:
+            changes: dict[str, Any] = {}
+            if record["display_title"] != record["title"]:
+                changes["title"] = record["display_title"]
+            if record["display_source"] != record["source"]:
+                changes["source"] = record["display_source"]
+            latest_items_all.append(RecordView(record, changes))
+
+    # Newest first, so the translation budget goes to the newest titles.
+    latest_items_all.sort(key=event_sort_key, reverse=True)
+    # AI HubToday anchors are collapsed per window (build_window_view), since the
+    # best anchor in a narrow window may not be the best one in the widest.
+    latest_items = [record for record in latest_items_all if record["topic_ai"]]
+    title_cache = translation.open_title_cache(title_cache_dir, now.date().isoformat(), output_dir / "title-zh-cache.json")
+    clusters = cluster_near_duplicates(latest_items_all)
+    cluster_sizes = Counter(clusters.values())
     latest_items, latest_items_all, title_cache = add_bilingual_fields(
         latest_items,
         latest_items_all,
         session,
         title_cache,
         max_new_translations=max(0, args.translate_max_new),
+        popularity={item_id: cluster_sizes[cid] for item_id, cid in clusters.items()},
+        zh_index=zh_index,
+        workers=max(1, args.translate_workers),
+        rate=args.translate_rps,
     )
-    latest_items_ai_dedup = dedupe_items_by_title_url(latest_items, random_pick=False)
-    latest_items_all_dedup = dedupe_items_by_title_url(latest_items_all, random_pick=True)
-
-    # site stats
-    site_stat: dict[str, dict[str, Any]] = {}
-    raw_count_by_site: dict[str, int] = {}
-    for record in latest_items_all:
-        sid = record["site_id"]
-        raw_count_by_site[sid] = raw_count_by_site.get(sid, 0) + 1
-
-    site_name_by_id: dict[str, str] = {}
-    for record in latest_items_all:
-        site_name_by_id[record["site_id"]] = record["site_name"]
-    for s in statuses:
-        sid = s["site_id"]
-        if sid not in site_name_by_id:
-            site_name_by_id[sid] = s.get("site_name") or sid
-
-    for record in latest_items_ai_dedup:
-        sid = record["site_id"]
-        if sid not in site_stat:
-            site_stat[sid] = {
-                "site_id": sid,
-                "site_name": record["site_name"],
-                "count": 0,
-                "raw_count": raw_count_by_site.get(sid, 0),
-            }
-        site_stat[sid]["count"] += 1
-
-    for sid, site_name in site_name_by_id.items():
-        if sid in site_stat:
-            continue
-        site_stat[sid] = {
-            "site_id": sid,
-            "site_name": site_name,
-            "count": 0,
-            "raw_count": raw_count_by_site.get(sid, 0),
-        }
-
-    latest_payload = {
-        "generated_at": iso(now),
-        "window_hours": args.window_hours,
-        "total_items": len(latest_items_ai_dedup),
-        "total_items_ai_raw": len(latest_items),
-        "total_items_raw": len(latest_items_all),
-        "total_items_all_mode": len(latest_items_all_dedup),
-        "topic_filter": "ai_tech_robotics",
-        "archive_total": len(archive),
-        "site_count": len(site_stat),
-        "source_count": len({f"{i['site_id']}::{i['source']}" for i in latest_items_ai_dedup}),
-        "site_stats": sorted(site_stat.values(), key=lambda x: x["count"], reverse=True),
-        "items": latest_items_ai_dedup,
-        "items_ai": latest_items_ai_dedup,
-        "items_all_raw": latest_items_all,
-        "items_all": latest_items_all_dedup,
-    }
-
-    archive_payload = {
-        "generated_at": iso(now),
-        "total_items": len(archive),
-        "items": sorted(
-            archive.values(),
-            key=lambda x: parse_iso(x.get("last_seen_at")) or datetime.min.replace(tzinfo=UTC),
-            reverse=True,
-        ),
-    }
+    ai_ids = {str(record["id"]) for record in latest_items}
+    event_index = build_event_index(latest_items_all)
+
+    window_views: dict[int, tuple[dict[str, Any], dict[str, Any]]] = {}
+    for hours in window_hours_all:
+        meta, items_ai, items_ai_dedup, items_all, items_all_dedup = build_window_view(
+            window_slice(event_index, (now - timedelta(hours=hours)).timestamp()),
+            ai_ids,
+            clusters,
+            statuses,
+            hours,
+            now,
+            len(store.index),
+        )
+        if hours == args.window_hours:
+            meta["windows"] = [
+                {"window_hours": h, "file": window_view_filename(h)} for h in window_hours_all if h != args.window_hours
+            ]
+            latest_items, latest_items_all, latest_items_ai_dedup = items_ai, items_all, items_ai_dedup
+            latest_meta = meta
+        window_views[hours] = render_latest_payload(
+            meta, items_ai_dedup, items_all, items_all_dedup, args.payload_version
+        )
+    compact_payload, latest_payload = window_views[args.window_hours]
 
     status_payload = {
         "generated_at": iso(now),
@@ -2261,33 +3643,64 @@ def main() -> int:
         },
     }
 
-    try:
-        waytoagi_payload = fetch_waytoagi_recent_7d(session, now, WAYTOAGI_DEFAULT)
-    except Exception as exc:
-        waytoagi_payload = {
-            "generated_at": iso(now),
-            "timezone": "Asia/Shanghai",
-            "root_url": WAYTOAGI_DEFAULT,
-            "history_url": None,
-            "window_days": 7,
-            "count_7d": 0,
-            "updates_7d": [],
-            "warning": "WaytoAGI 近7日更新抓取失败",
-            "has_error": True,
-            "error": str(exc),
-        }
+    # WaytoAGI is not part of source-status.json; a failed-only refresh retries it
+    # only when its last output reported an error.
+    previous_waytoagi = load_json_object(waytoagi_path) if refresh is not None else None
+    waytoagi_payload: dict[str, Any] | None = None
+    if previous_waytoagi is None or previous_waytoagi.get("has_error"):
+        try:
+            waytoagi_payload = fetch_waytoagi_recent_7d(session, now, WAYTOAGI_DEFAULT)
+        except Exception as exc:
+            waytoagi_payload = {
+                "generated_at": iso(now),
+                "timezone": "Asia/Shanghai",
+                "root_url": WAYTOAGI_DEFAULT,
+                "history_url": None,
+                "window_days": 7,
+                "count_7d": 0,
+                "updates_7d": [],
+                "warning": "WaytoAGI 近7日更新抓取失败",
+                "has_error": True,
+                "error": str(exc),
+            }
 
-    latest_path.write_text(json.dumps(latest_payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    archive_path.write_text(json.dumps(archive_payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    status_path.write_text(json.dumps(status_payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    waytoagi_path.write_text(json.dumps(waytoagi_payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    title_cache_path.write_text(json.dumps(title_cache, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    print(f"Wrote: {latest_path} ({len(latest_items)} items)")
-    print(f"Wrote: {archive_path} ({len(archive)} items)")
-    print(f"Wrote: {status_path}")
-    print(f"Wrote: {waytoagi_path} ({waytoagi_payload.get('count_7d', 0)} items)")
-    print(f"Wrote: {title_cache_path} ({len(title_cache)} entries)")
+    write_archive_manifest(store, now)
+    # Left by releases that persisted the all-mode dedupe picks.
+    (archive_dir / "dedup-index.json.gz").unlink(missing_ok=True)
+    save_zh_title_index(zh_title_index_path, zh_index, store.index)
+    if args.shard_page_size > 0:
+        shard_manifest, shards = build_latest_shards(compact_payload, args.shard_page_size)
+        shard_manifest["deltas"] = update_latest_deltas(shard_dir, previous_latest, compact_payload)
+        shard_writes = write_latest_shards(shard_dir, shard_manifest, shards)
+        print(f"Wrote: {shard_dir} ({shard_writes}/{len(shards)} shards changed)")
+    outputs = [
+        (latest_path, latest_payload, f"{len(latest_items)} items"),
+        *(
+            (output_dir / window_view_filename(h), window_views[h][1], f"{window_views[h][0]['total_items']} items")
+            for h in window_hours_all
+            if h != args.window_hours
+        ),
+        (status_path, status_payload, None),
+    ]
+    if waytoagi_payload is not None:
+        outputs.append((waytoagi_path, waytoagi_payload, f"{waytoagi_payload.get('count_7d', 0)} items"))
+    if args.digest_items > 0:
+        digest = build_email_digest(latest_meta, latest_items_ai_dedup, args.digest_items)
+        outputs.append((digest_path, digest, f"{len(digest['items'])} items"))
+    for path, payload, detail in outputs:
+        verb = "Wrote" if write_json_if_changed(path, payload) else "Unchanged"
+        print(f"{verb}: {path}" + (f" ({detail})" if detail else ""))
+    cache_writes = translation.save_title_cache(title_cache)
+    print(f"Wrote: {title_cache_dir} ({len(title_cache)} entries loaded, {cache_writes} buckets changed)")
+    print(f"Wrote: {archive_dir} ({len(store.index)} items, {len(store.partitions)} partitions, {renormalized} renormalized)")
+    if args.columnar_snapshot:
+        if np is None:
+            print("Skipped: columnar snapshot (numpy is not installed)")
+        else:
+            snapshot = build_columnar_snapshot(list(load_archive_since(store, "").values()))
+            changed = write_columnar_snapshot(archive_dir / "columnar", snapshot, now)
+            print(f"Wrote: {archive_dir / 'columnar'} ({len(snapshot)} rows, {changed} files changed)")
+    print(translation.STATS.summary())
 
     return 0
 
@@ -0,0 +1,91 @@
+"""Minimal local SMTP server for the email tests: accepts and records every message.
+
+    with SmtpSink() as sink:
+        ...send to 127.0.0.1:sink.port...
+    sink.messages  # [(mail_from, [rcpt, ...], raw bytes), ...]
+
+Recipients listed in `reject` get a 550, and `drop_after` closes each
+connection after that many messages to exercise reconnects.
+"""
+
+from __future__ import annotations
+
+import socketserver
+import threading
+
+
+class SmtpSink:
+    def __init__(self, reject: set[str] | None = None, drop_after: int = 0) -> None:
+        self.reject = reject or set()
+        self.drop_after = drop_after
+        self.messages: list[tuple[str, list[str], bytes]] = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def _handler(self) -> type[socketserver.StreamRequestHandler]:
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str) -> None:
+                self.wfile.write(line.encode("ascii") + b"\r\n")
+
+            def handle(self) -> None:
+                with sink.lock:
+                    sink.connections += 1
+                self.reply("220 sink ready")
+                mail_from, rcpts, sent = "", [], 0
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    cmd = line.decode("utf-8", "replace").strip()
+                    verb = cmd.split(" ", 1)[0].upper()
+                    if verb == "EHLO":
+                        self.reply("250-sink")
+                        self.reply("250 8BITMIME")
+                    elif verb in ("HELO", "NOOP", "RSET"):
+                        mail_from, rcpts = ("", []) if verb == "RSET" else (mail_from, rcpts)
+                        self.reply("250 ok")
+                    elif verb == "MAIL":
+                        mail_from, rcpts = cmd.split(":", 1)[1].strip().split(" ")[0].strip("<>"), []
+                        self.reply("250 ok")
+                    elif verb == "RCPT":
+                        rcpt = cmd.split(":", 1)[1].strip().strip("<>")
+                        if rcpt in sink.reject:
+                            self.reply("550 no such user")
+                        else:
+                            rcpts.append(rcpt)
+                            self.reply("250 ok")
+                    elif verb == "DATA":
+                        self.reply("354 end with .")
+                        data = []
+                        while True:
+                            chunk = self.rfile.readline()
+                            if not chunk or chunk == b".\r\n":
+                                break
+                            data.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                        with sink.lock:
+                            sink.messages.append((mail_from, rcpts, b"".join(data)))
+                        self.reply("250 queued")
+                        sent += 1
+                        if sink.drop_after and sent >= sink.drop_after:
+                            return
+                    elif verb == "QUIT":
+                        self.reply("221 bye")
+                        return
+                    else:
+                        self.reply("502 not implemented")
+
+        return Handler
+
+    def __enter__(self) -> "SmtpSink":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,73 @@
+"""Local stand-in for the gtx translate endpoint, used by tests and benchmarks.
+
+Each input line comes back as its own segment, prefixed with "译:", so batch
+splitting can be checked without the network.
+
+    with StubTranslateServer(latency=0.05) as stub:
+        translate_titles(session, titles, endpoint=stub.endpoint)
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubTranslateServer:
+    def __init__(self, latency: float = 0.0, merge_lines: bool = False, fail: bool = False) -> None:
+        self.latency = latency
+        # Join all lines into one segment, like a reply that drops the delimiter.
+        self.merge_lines = merge_lines
+        # Answer every request with 503, like a throttled endpoint.
+        self.fail = fail
+        self.requests: list[str] = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/translate_a/single"
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                text = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+                with stub.lock:
+                    stub.requests.append(text)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if stub.fail:
+                    self.send_error(503)
+                    return
+                lines = text.split("\n")
+                if stub.merge_lines:
+                    segs = [["译:" + " ".join(lines), text]]
+                else:
+                    segs = [["译:" + line + ("\n" if i < len(lines) - 1 else ""), line] for i, line in enumerate(lines)]
+                body = json.dumps([segs, None, "en"], ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "StubTranslateServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
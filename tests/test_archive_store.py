@@ -0,0 +1,160 @@
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from scripts.update_news import (
+    ArchiveRecord,
+    RecordView,
+    attach_epoch_fields,
+    build_columnar_snapshot,
+    columnar_retention_mask,
+    columnar_site_counts,
+    columnar_string,
+    columnar_window_mask,
+    compact_archive_store,
+    load_archive_records,
+    load_archive_since,
+    load_columnar_snapshot,
+    needs_normalization,
+    normalize_record,
+    public_record,
+    open_archive_store,
+    prune_archive_store,
+    read_archive_partition,
+    save_archive_records,
+    write_archive_manifest,
+    write_columnar_snapshot,
+)
+
+try:
+    import numpy
+except ModuleNotFoundError:
+    numpy = None
+
+NOW = datetime(2026, 2, 20, 12, 0, tzinfo=timezone.utc)
+
+
+def rec(item_id: str, last_seen: str) -> dict:
+    return {
+        "id": item_id,
+        "site_id": "techurls",
+        "site_name": "TechURLs",
+        "source": "Hacker News",
+        "title": f"Title {item_id}",
+        "url": f"https://example.com/{item_id}",
+        "published_at": None,
+        "first_seen_at": "2026-02-10T08:00:00Z",
+        "last_seen_at": last_seen,
+    }
+
+
+class ArchiveStoreTests(unittest.TestCase):
+    def test_upsert_goes_to_last_seen_partition(self):
+        with TemporaryDirectory() as td:
+            store = open_archive_store(Path(td), NOW)
+            save_archive_records(store, {"a": rec("a", "2026-02-18T10:00:00Z")}, NOW)
+            save_archive_records(store, {"b": rec("b", "2026-02-20T11:00:00Z")}, NOW)
+            self.assertEqual(sorted(store.partitions), ["2026-02-18", "2026-02-20"])
+            self.assertEqual(list(load_archive_since(store, "2026-02-19")), ["b"])
+            self.assertEqual(list(load_archive_records(store, {"a"})), ["a"])
+
+    def test_moved_record_reads_live_copy_and_compacts(self):
+        with TemporaryDirectory() as td:
+            store = open_archive_store(Path(td), NOW)
+            save_archive_records(store, {"a": rec("a", "2026-02-18T10:00:00Z")}, NOW)
+            save_archive_records(store, {"a": rec("a", "2026-02-20T11:00:00Z")}, NOW)
+            write_archive_manifest(store, NOW)
+
+            reopened = open_archive_store(Path(td), NOW)
+            self.assertEqual(reopened.index, {"a": "2026-02-20"})
+            self.assertEqual(load_archive_since(reopened, "2026-02-01")["a"]["last_seen_at"], "2026-02-20T11:00:00Z")
+
+            self.assertEqual(compact_archive_store(reopened), 1)
+            self.assertEqual(sorted(reopened.partitions), ["2026-02-20"])
+
+    def test_prune_drops_whole_expired_partitions(self):
+        with TemporaryDirectory() as td:
+            store = open_archive_store(Path(td), NOW)
+            save_archive_records(store, {"old": rec("old", "2026-01-01T10:00:00Z")}, NOW)
+            save_archive_records(store, {"new": rec("new", "2026-02-19T10:00:00Z")}, NOW)
+            self.assertEqual(prune_archive_store(store, NOW - timedelta(days=30)), 1)
+            self.assertEqual(sorted(store.partitions), ["2026-02-19"])
+            self.assertFalse((Path(td) / "2026-01-01.jsonl.gz").exists())
+
+    def test_migrates_legacy_archive_json(self):
+        with TemporaryDirectory() as td:
+            legacy = Path(td) / "archive.json"
+            legacy.write_text(
+                json.dumps({"items": [rec("a", "2026-02-18T10:00:00Z"), rec("b", "2026-02-20T10:00:00Z")]}),
+                encoding="utf-8",
+            )
+            store = open_archive_store(Path(td) / "archive", NOW, legacy_path=legacy)
+            self.assertFalse(legacy.exists())
+            self.assertEqual(store.index, {"a": "2026-02-18", "b": "2026-02-20"})
+            rows = read_archive_partition(Path(td) / "archive" / "2026-02-18.jsonl.gz")
+            self.assertEqual([r["id"] for r in rows], ["a"])
+
+
+class RecordModelTests(unittest.TestCase):
+    def test_archive_record_interns_categorical_fields(self):
+        a = ArchiveRecord.from_dict(json.loads(json.dumps(rec("a", "2026-02-18T10:00:00Z"))))
+        b = ArchiveRecord.from_dict(json.loads(json.dumps(rec("b", "2026-02-18T10:00:00Z"))))
+        self.assertIs(a["source"], b["source"])
+        self.assertEqual(a["event_ts"], datetime(2026, 2, 10, 8, 0, tzinfo=timezone.utc).timestamp())
+        self.assertEqual(dict(a)["title"], "Title a")
+
+    def test_record_view_is_copy_on_write(self):
+        base = ArchiveRecord.from_dict(rec("a", "2026-02-18T10:00:00Z"))
+        view = RecordView(RecordView(base, {"title": "Fixed"}), {"title_zh": "标题"})
+        self.assertIs(view.base, base)
+        self.assertEqual(view["title"], "Fixed")
+        self.assertEqual(view["title_zh"], "标题")
+        self.assertEqual(base["title"], "Title a")
+        self.assertEqual(list(view)[-1], "title_zh")
+
+    def test_normalized_fields_persist_and_stay_private(self):
+        record = ArchiveRecord.from_dict(rec("a", "2026-02-18T10:00:00Z"))
+        record["title"] = "OpenAI ships agents"
+        self.assertTrue(needs_normalization(record))
+        normalize_record(record)
+        self.assertEqual((record["topic_ai"], record["title_lang"], record["placeholder"]), (True, "en", False))
+
+        with TemporaryDirectory() as td:
+            store = open_archive_store(Path(td), NOW)
+            save_archive_records(store, {"a": record}, NOW)
+            reloaded = load_archive_since(store, "2026-02-01")["a"]
+        self.assertFalse(needs_normalization(reloaded))
+        self.assertEqual(reloaded["display_title"], "OpenAI ships agents")
+        self.assertNotIn("topic_ai", public_record(reloaded))
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class ColumnarSnapshotTests(unittest.TestCase):
+    def test_snapshot_roundtrip_and_vectorized_queries(self):
+        records = [rec(i, seen) for i, seen in (
+            ("a", "2026-02-12T10:00:00Z"),
+            ("b", "2026-02-20T11:00:00Z"),
+            ("c", "2026-02-20T11:30:00Z"),
+        )]
+        records[1]["published_at"] = "2026-02-20T09:00:00Z"
+        records[2]["site_id"] = "buzzing"
+        records = [attach_epoch_fields(r) for r in records]
+        with TemporaryDirectory() as td:
+            write_columnar_snapshot(Path(td), build_columnar_snapshot(records), NOW)
+            snap = load_columnar_snapshot(Path(td))
+        self.assertEqual(len(snap), 3)
+        self.assertEqual([columnar_string(snap, "id", i) for i in range(3)], ["a", "b", "c"])
+        self.assertEqual(columnar_string(snap, "title", 1), "Title b")
+
+        window = columnar_window_mask(snap, (NOW - timedelta(hours=24)).timestamp())
+        self.assertEqual(window.tolist(), [False, True, False])
+        self.assertEqual(columnar_site_counts(snap), {"buzzing": 1, "techurls": 2})
+        self.assertEqual(columnar_site_counts(snap, window), {"techurls": 1})
+        keep = columnar_retention_mask(snap, (NOW - timedelta(days=2)).timestamp())
+        self.assertEqual(keep.tolist(), [False, True, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
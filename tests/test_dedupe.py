@@ -0,0 +1,34 @@
+import unittest
+
+from scripts.update_news import cluster_near_duplicates, dedupe_items_by_title_url
+
+
+class NearDuplicateTests(unittest.TestCase):
+    def test_clusters_reworded_titles_across_sources(self):
+        items = [
+            {"id": "a", "title": "OpenAI releases GPT-5 with native agents", "published_at": "2026-02-20T03:00:00Z"},
+            {"id": "b", "title": "OpenAI releases GPT-5 with native agents!", "published_at": "2026-02-20T01:00:00Z"},
+            {"id": "c", "title": "OpenAI releases GPT 5, with native agents", "published_at": "2026-02-20T02:00:00Z"},
+            {"id": "d", "title": "Nvidia earnings beat expectations", "published_at": "2026-02-20T02:30:00Z"},
+            {"id": "e", "title": "", "published_at": "2026-02-20T02:30:00Z"},
+            {"id": "f", "title": "OpenAI releases GPT-4 with native agents", "published_at": "2026-02-20T00:00:00Z"},
+        ]
+        clusters = cluster_near_duplicates(items)
+        self.assertEqual(clusters, {"a": "b", "b": "b", "c": "b", "d": "d", "e": "e", "f": "f"})
+
+
+class TitleUrlDedupeTests(unittest.TestCase):
+    def test_representative_is_the_same_whatever_the_input_order(self):
+        def copy(item_id, published):
+            return {"id": item_id, "title": "Same", "url": "https://example.com/a", "published_at": published}
+
+        tied = [copy("1", "2026-02-20T01:00:00Z"), copy("2", "2026-02-20T01:00:00Z")]
+        # Same event time: the larger id wins in either order, so runs do not flip the pick.
+        self.assertEqual(dedupe_items_by_title_url(tied)[0]["id"], "2")
+        self.assertEqual(dedupe_items_by_title_url(tied[::-1])[0]["id"], "2")
+        newer = dedupe_items_by_title_url([*tied, copy("0", "2026-02-20T02:00:00Z")])
+        self.assertEqual([i["id"] for i in newer], ["0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,263 @@
+import io
+import json
+import sys
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+import scripts.update_news as update_news
+from scripts.send_email import load_news, payload_items
+from scripts.update_news import (
+    apply_latest_delta,
+    build_latest_delta,
+    build_event_index,
+    build_latest_shards,
+    build_email_digest,
+    build_window_view,
+    compact_latest_payload,
+    expand_latest_payload,
+    latest_generation,
+    shard_slug,
+    window_slice,
+    write_latest_shards,
+)
+
+
+def item(item_id: str, title: str, title_en=None, title_zh=None, site_id: str = "techurls") -> dict:
+    bilingual = f"{title_zh} / {title}" if title_en and title_zh else title
+    return {
+        "id": item_id,
+        "site_id": site_id,
+        "site_name": "TechURLs",
+        "source": "Hacker News",
+        "title": title,
+        "url": f"https://example.com/{item_id}",
+        "published_at": "2026-02-20T01:00:00Z",
+        "first_seen_at": "2026-02-20T01:30:00Z",
+        "title_original": title,
+        "title_en": title_en,
+        "title_zh": title_zh,
+        "title_bilingual": bilingual,
+        "cluster_id": item_id,
+        "cluster_size": 1,
+    }
+
+
+class CompactPayloadTests(unittest.TestCase):
+    def setUp(self):
+        self.a = item("a", "OpenAI ships agents", "OpenAI ships agents", "OpenAI 发布智能体")
+        self.b = item("b", "大模型推理加速", None, "大模型推理加速")
+        self.c = item("c", "Football scores tonight", "Football scores tonight", None)
+        self.meta = {"generated_at": "2026-02-20T02:00:00Z", "total_items": 2}
+
+    def test_roundtrip_matches_full_layout(self):
+        payload = compact_latest_payload(self.meta, [self.a, self.b], [self.a, self.b, self.c], [self.a, self.c])
+        self.assertEqual(len(payload["item_table"]), 3)
+        out = expand_latest_payload(payload)
+        self.assertEqual(out["items"], [self.a, self.b])
+        self.assertEqual(out["items_ai"], [self.a, self.b])
+        self.assertEqual(out["items_all_raw"], [self.a, self.b, self.c])
+        self.assertEqual(out["items_all"], [self.a, self.c])
+        self.assertEqual(out["total_items"], 2)
+
+    def test_v1_payload_passes_through(self):
+        v1 = {**self.meta, "items": [self.a]}
+        self.assertIs(expand_latest_payload(v1), v1)
+        self.assertEqual(payload_items(v1), [self.a])
+
+    def test_send_email_reads_v2_ai_view(self):
+        payload = compact_latest_payload(self.meta, [self.b], [self.a, self.b], [self.a, self.b])
+        items = payload_items(payload)
+        self.assertEqual([i["id"] for i in items], ["b"])
+        self.assertEqual(items[0]["title_zh"], "大模型推理加速")
+
+    def test_shards_cover_every_row_and_view(self):
+        d = item("d", "Robotics chip news", "Robotics chip news", None, site_id="buzzing")
+        payload = compact_latest_payload(self.meta, [self.a, d], [self.a, self.b, self.c, d], [self.a, self.c, d])
+        manifest, shards = build_latest_shards(payload, page_size=3)
+        self.assertEqual([p["count"] for p in manifest["pages"]], [3, 1])
+        self.assertEqual({s["site_id"]: s["count"] for s in manifest["sites"]}, {"buzzing": 1, "techurls": 3})
+        self.assertNotIn("item_table", manifest)
+
+        views = {name: set() for name in manifest["view_totals"]}
+        rows = {}
+        for page in manifest["pages"]:
+            shard = shards[page["file"]]
+            rows.update(zip(shard["rows"], shard["item_table"]))
+            for name, idxs in shard["views"].items():
+                views[name].update(idxs)
+        self.assertEqual(rows, dict(enumerate(payload["item_table"])))
+        self.assertEqual({k: sorted(v) for k, v in views.items()}, {k: sorted(v) for k, v in payload["views"].items()})
+
+        site = shards[next(s["file"] for s in manifest["sites"] if s["site_id"] == "buzzing")]
+        self.assertEqual(site["views"]["items_ai"], site["rows"])
+        self.assertTrue(all(name.startswith(f"g/{manifest['shard_generation']}/") for name in shards))
+        self.assertNotEqual(shard_slug("a.b"), shard_slug("a-b"))
+
+    def test_shard_generations_are_written_side_by_side_and_pruned(self):
+        def generation(items):
+            payload = compact_latest_payload(self.meta, items, items, items)
+            payload["generation"] = latest_generation(payload)
+            return build_latest_shards(payload, page_size=1)
+
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            (root / "pages").mkdir()
+            (root / "pages" / "000.json").write_text("{}", encoding="utf-8")
+            manifests = []
+            for items in ([self.a], [self.a, self.b], [self.b, self.c]):
+                manifest, shards = generation(items)
+                write_latest_shards(root, manifest, shards)
+                manifests.append(manifest)
+                on_disk = json.loads((root / manifest["pages"][0]["file"]).read_text(encoding="utf-8"))
+                self.assertEqual(on_disk, shards[manifest["pages"][0]["file"]])
+            self.assertFalse((root / "pages").exists())
+            kept = sorted(p.name for p in (root / "g").iterdir())
+            self.assertEqual(kept, sorted(m["shard_generation"] for m in manifests[1:]))
+            self.assertEqual(json.loads((root / "manifest.json").read_text(encoding="utf-8")), manifests[2])
+
+    def test_meta_only_change_reuses_the_shard_directory(self):
+        shard_dirs = set()
+        for total in (2, 3):
+            payload = compact_latest_payload({**self.meta, "total_items": total}, [self.a], [self.a], [self.a])
+            payload["generation"] = latest_generation(payload)
+            manifest, shards = build_latest_shards(payload, page_size=1)
+            shard_dirs.add(manifest["shard_generation"])
+            self.assertTrue(all(name.startswith(f"g/{manifest['shard_generation']}/") for name in shards))
+        self.assertEqual(len(shard_dirs), 1)
+
+    def test_delta_replays_to_current_generation(self):
+        previous = compact_latest_payload(self.meta, [self.a, self.b], [self.a, self.b, self.c], [self.a, self.c])
+        previous["generation"] = latest_generation(previous)
+        a2 = {**self.a, "title_zh": "OpenAI 推出智能体"}
+        d = item("d", "Robotics chip news", "Robotics chip news", None)
+        current = compact_latest_payload({**self.meta, "total_items": 3}, [d, a2], [d, a2, self.c], [d, a2, self.c])
+        current["generation"] = latest_generation(current)
+
+        delta = build_latest_delta(previous, current)
+        self.assertEqual(delta["removed"], ["b"])
+        self.assertEqual([r[0] for r in delta["added"]], ["d"])
+        self.assertEqual(delta["changed"], {"a": {"title_zh": "OpenAI 推出智能体"}})
+        self.assertEqual(delta["views"]["items_ai"], {"add": ["d"], "remove": ["b"]})
+        self.assertEqual(delta["views"]["items_all"], {"add": ["d"], "remove": []})
+        self.assertEqual(apply_latest_delta(previous, delta), current)
+
+    def test_delta_size_does_not_grow_with_unchanged_rows(self):
+        def payload(items, generated_at):
+            out = compact_latest_payload({**self.meta, "generated_at": generated_at}, items, items, items)
+            out["generation"] = latest_generation(out)
+            return out
+
+        items = [item(f"i{n}", f"AI item {n}") for n in range(500)]
+        previous = payload(items, "2026-02-20T02:00:00Z")
+        # Same rows, only the run timestamp moved: nothing but the meta to send.
+        delta = build_latest_delta(previous, payload(items, "2026-02-20T02:30:00Z"))
+        self.assertEqual((delta["rows"], delta["added"], delta["changed"]), ([[0, 500]], [], {}))
+        self.assertEqual(list(delta["views"].values()), [{"add": [], "remove": []}] * 3)
+        self.assertLess(len(json.dumps(delta)), 1024)
+
+        new = item("new", "AI item new")
+        current = payload([new, *items[:-1]], "2026-02-20T03:00:00Z")
+        delta = build_latest_delta(previous, current)
+        self.assertEqual(delta["rows"], [[-1, 1], [0, 499]])
+        self.assertEqual(delta["views"]["items_all_raw"], {"add": ["new"], "remove": ["i499"]})
+        self.assertLess(len(json.dumps(delta)), 2048)
+        self.assertEqual(apply_latest_delta(previous, delta), current)
+
+    def test_email_digest_is_read_before_the_full_payload(self):
+        digest = build_email_digest({**self.meta, "window_hours": 24}, [self.a, self.b], limit=1)
+        self.assertEqual(digest["items"], [{k: self.a[k] for k in digest["items"][0]}])
+        self.assertEqual(digest["items"][0]["title_zh"], "OpenAI 发布智能体")
+        self.assertNotIn("title_bilingual", digest["items"][0])
+
+        with TemporaryDirectory() as td:
+            full = compact_latest_payload(self.meta, [self.b, self.a], [self.a, self.b], [self.a, self.b])
+            (Path(td) / "latest-24h.json").write_text(json.dumps(full), encoding="utf-8")
+            self.assertEqual([i["id"] for i in load_news(Path(td))], ["b", "a"])
+            (Path(td) / "email-digest.json").write_text(json.dumps(digest), encoding="utf-8")
+            self.assertEqual([i["id"] for i in load_news(Path(td))], ["a"])
+
+
+class WindowViewTests(unittest.TestCase):
+    def test_windows_are_prefixes_of_one_event_index(self):
+        now = datetime(2026, 2, 20, 12, 0, tzinfo=timezone.utc)
+        records = []
+        for hours_ago in (0.5, 3, 20, 50):
+            r = item(f"h{hours_ago}", f"AI item {hours_ago}")
+            r["event_ts"] = now.timestamp() - hours_ago * 3600
+            records.append(r)
+        index = build_event_index(records)
+        counts = {}
+        for hours in (1, 6, 24, 72):
+            window = window_slice(index, now.timestamp() - hours * 3600)
+            meta, items_ai, _, items_all, _ = build_window_view(window, {"h3", "h50"}, {}, [], hours, now, 4)
+            counts[hours] = (meta["total_items_raw"], meta["total_items_ai_raw"])
+            self.assertEqual([r["id"] for r in items_all], [r["id"] for r in index[0][: len(items_all)]])
+        self.assertEqual(counts, {1: (1, 0), 6: (2, 1), 24: (3, 1), 72: (4, 2)})
+
+    def test_clusters_are_named_and_counted_within_each_window(self):
+        now = datetime(2026, 2, 20, 12, 0, tzinfo=timezone.utc)
+        records = []
+        for item_id, hours_ago in (("late", 1), ("mid", 3), ("early", 50)):
+            r = item(item_id, "OpenAI ships agents")
+            r["event_ts"] = now.timestamp() - hours_ago * 3600
+            records.append(r)
+        clusters = {"late": "early", "mid": "early", "early": "early"}
+        index = build_event_index(records)
+        seen = {}
+        for hours in (6, 72):
+            _, _, _, items_all, _ = build_window_view(
+                window_slice(index, now.timestamp() - hours * 3600), set(), clusters, [], hours, now, 3
+            )
+            seen[hours] = {r["id"]: (r["cluster_id"], r["cluster_size"]) for r in items_all}
+        self.assertEqual(seen[6], {"late": ("mid", 2), "mid": ("mid", 2)})
+        self.assertEqual(seen[72], {"late": ("early", 3), "mid": ("early", 3), "early": ("early", 3)})
+
+
+def fake_translation(session, text: str, *args) -> str:
+    return "\n".join(f"译：{line}" for line in text.split("\n"))
+
+
+class RerunTests(unittest.TestCase):
+    def run_update(self, output_dir: Path, now: datetime, raw_items: list) -> None:
+        statuses = [{"site_id": "techurls", "site_name": "TechURLs", "ok": True, "item_count": len(raw_items), "duration_ms": 1}]
+        with mock.patch.object(update_news, "utc_now", return_value=now), mock.patch.object(
+            update_news, "collect_all", return_value=(list(raw_items), statuses)
+        ), mock.patch.object(
+            update_news, "fetch_waytoagi_recent_7d", return_value={"generated_at": "x", "count_7d": 0, "updates_7d": []}
+        ), mock.patch.object(
+            update_news.translation, "request_translation", side_effect=fake_translation
+        ), mock.patch.object(
+            sys, "argv", ["update_news.py", "--output-dir", str(output_dir), "--shard-page-size", "2"]
+        ), redirect_stdout(io.StringIO()):
+            self.assertEqual(update_news.main(), 0)
+
+    def test_same_fetch_results_rewrite_no_latest_output(self):
+        now = datetime(2026, 2, 20, 12, 0, tzinfo=timezone.utc)
+        raw_items = [
+            update_news.RawItem(
+                "techurls", "TechURLs", "Hacker News", title, f"https://example.com/{i}", now - timedelta(hours=hours), {}
+            )
+            for i, (title, hours) in enumerate(
+                [("OpenAI ships agents", 0.1), ("大模型推理加速", 2), ("AI robotics chip", 10)]
+            )
+        ]
+        with TemporaryDirectory() as td:
+            root = Path(td)
+
+            def latest_outputs() -> dict[str, bytes]:
+                paths = [*root.glob("latest-*.json"), root / "email-digest.json", *(root / "latest-24h").rglob("*.json")]
+                return {str(p.relative_to(root)): p.read_bytes() for p in paths}
+
+            self.run_update(root, now, raw_items)
+            first = latest_outputs()
+            self.run_update(root, now + timedelta(minutes=30), raw_items)
+            self.assertEqual(latest_outputs(), first)
+            self.assertEqual(len(list((root / "latest-24h" / "g").iterdir())), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,316 @@
+import email
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from scripts import send_email
+from tests.smtp_sink import SmtpSink
+
+
+def rss(*titles: str) -> str:
+    items = "".join(
+        f"<item><title>{title}</title><description>{title} said something long enough</description>"
+        "<link>https://x.example/1</link><pubDate>Fri, 20 Feb 2026 00:00:00 GMT</pubDate></item>"
+        for title in titles
+    )
+    return f"<rss><channel>{items}</channel></rss>"
+
+
+def atom(title: str) -> str:
+    return (
+        '<feed xmlns="http://www.w3.org/2005/Atom"><entry>'
+        f'<title>{title}</title><link href="https://youtube.example/{len(title)}"/>'
+        "<published>2026-02-20T00:00:00+00:00</published></entry></feed>"
+    )
+
+
+class FeedServer:
+    """Serves fixed bodies per path after a delay; unknown paths are 404.
+
+    Each body's ETag is its hash, and a matching If-None-Match gets a 304.
+    """
+
+    def __init__(self, delay: float, feeds: dict[str, str]) -> None:
+        self.delay = delay
+        self.feeds = feeds
+        self.statuses: list[int] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                time.sleep(server.delay)
+                body = server.feeds.get(self.path)
+                etag = f'"{hash(body)}"'
+                status = 404 if not body else 304 if self.headers.get("If-None-Match") == etag else 200
+                server.statuses.append(status)
+                self.send_response(status)
+                if body:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                if status == 200:
+                    self.wfile.write(body.encode("utf-8"))
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TwitterFetchTests(unittest.TestCase):
+    def setUp(self):
+        self.servers = []
+        self.tmp = TemporaryDirectory()
+        self.experts = [
+            {"name": "Alpha", "handle": "alpha", "role": "A"},
+            {"name": "Beta", "handle": "beta", "role": "B"},
+            {"name": "Gamma", "handle": "gamma", "role": "C"},
+        ]
+
+    def tearDown(self):
+        for server in self.servers:
+            server.close()
+        self.tmp.cleanup()
+
+    def server(self, delay, feeds):
+        server = FeedServer(delay, feeds)
+        self.servers.append(server)
+        return server
+
+    def patched(self, mirrors, deadline=5, stagger=0):
+        return mock.patch.multiple(
+            send_email,
+            DATA_DIR=Path(self.tmp.name),
+            MIRROR_STAGGER=stagger,
+            TWITTER_EXPERTS=self.experts,
+            RSSHUB_MIRRORS=[m.base for m in mirrors],
+            NITTER_BASE=self.server(0, {}).base,
+            TWITTER_DEADLINE=deadline,
+            translate_many=lambda texts: {t: f"译:{t}" for t in texts},
+        )
+
+    def test_fastest_mirror_wins_and_expert_order_is_kept(self):
+        slow = self.server(1.0, {f"/twitter/user/{e['handle']}": rss(f"slow {e['name']}") for e in self.experts})
+        fast = self.server(0.05, {"/twitter/user/alpha": rss("fast Alpha"), "/twitter/user/gamma": rss("fast Gamma")})
+        with self.patched([slow, fast]):
+            start = time.perf_counter()
+            items = send_email.fetch_twitter_experts()
+            elapsed = time.perf_counter() - start
+        self.assertEqual([i["expert_name"] for i in items], ["Alpha", "Beta", "Gamma"])
+        self.assertEqual([i["content"].split()[0] for i in items], ["fast", "slow", "fast"])
+        self.assertEqual([i["content_zh"] for i in items], [f"译:{i['content']}" for i in items])
+        self.assertLess(elapsed, 2.0)
+
+    def test_health_counts_one_sample_per_mirror_per_run(self):
+        feeds = {f"/twitter/user/{e['handle']}": rss(e["name"]) for e in self.experts}
+        feeds["/twitter/user/gamma"] = rss()  # valid feed, nothing posted
+        dead, alive = self.server(0, {}), self.server(0.05, feeds)
+        path = Path(self.tmp.name) / send_email.MIRROR_HEALTH_FILE
+        with self.patched([dead, alive]):
+            self.assertEqual(len(send_email.fetch_twitter_experts()), 2)
+            health = send_email.load_mirror_health(path)
+            self.assertEqual((health[dead.base]["failures"], health[alive.base]["failures"]), (1, 0))
+            self.assertEqual(send_email.rank_mirrors(health, [dead.base, alive.base], time.time()), [alive.base, dead.base])
+            for _ in range(send_email.MIRROR_FAILURE_LIMIT - 1):
+                send_email.fetch_twitter_experts()
+        health = send_email.load_mirror_health(path)
+        self.assertEqual(health[dead.base]["failures"], send_email.MIRROR_FAILURE_LIMIT)
+        self.assertEqual(send_email.rank_mirrors(health, [dead.base, alive.base], time.time()), [alive.base])
+
+    def test_only_items_kept_for_the_email_are_translated_in_one_batch(self):
+        mirror = self.server(0, {"/twitter/user/alpha": rss("one", "two", "three")})
+        calls = []
+        self.experts = self.experts[:1]
+        with self.patched([mirror]), mock.patch.object(
+            send_email, "translate_many", lambda texts: calls.append(list(texts)) or {t: t for t in texts}
+        ):
+            items = send_email.fetch_twitter_experts()
+        self.assertEqual(len(items), 2)
+        self.assertEqual(calls, [[i["content"] for i in items]])
+
+    def test_experts_past_the_deadline_are_reported_as_failed(self):
+        slow = self.server(2.0, {f"/twitter/user/{e['handle']}": rss(e["name"]) for e in self.experts})
+        with self.patched([slow], deadline=0.3):
+            start = time.perf_counter()
+            items = send_email.fetch_twitter_experts()
+            elapsed = time.perf_counter() - start
+        self.assertEqual(items, [])
+        self.assertLess(elapsed, 1.0)
+
+
+class YouTubeFetchTests(unittest.TestCase):
+    def test_unchanged_feeds_reuse_cached_items_and_translations(self):
+        channels = [
+            {"name": "One", "channel_id": "one", "desc": "1"},
+            {"name": "Two", "channel_id": "two", "desc": "2"},
+        ]
+        server = FeedServer(0, {"/one": atom("First video"), "/two": atom("Second video")})
+        translated = []
+
+        def translate_many(texts):
+            translated.extend(texts)
+            return {t: f"译:{t}" for t in texts}
+
+        with TemporaryDirectory() as td, mock.patch.multiple(
+            send_email,
+            DATA_DIR=Path(td),
+            YOUTUBE_CHANNELS=channels,
+            YOUTUBE_FEED_URL=server.base + "/{channel_id}",
+            translate_many=translate_many,
+        ):
+            first = send_email.fetch_youtube_channels()
+            server.feeds["/two"] = atom("Second video, new cut")
+            second = send_email.fetch_youtube_channels()
+        server.close()
+
+        self.assertEqual([i["title_zh"] for i in first], ["译:First video", "译:Second video"])
+        self.assertEqual([i["title_zh"] for i in second], ["译:First video", "译:Second video, new cut"])
+        self.assertEqual(translated, ["First video", "Second video", "Second video, new cut"])
+        self.assertEqual(sorted(server.statuses[2:]), [200, 304])
+
+    def test_failed_translations_are_retried_on_unchanged_feeds(self):
+        channels = [{"name": "One", "channel_id": "one", "desc": "1"}]
+        server = FeedServer(0, {"/one": atom("First video")})
+        outcomes = [lambda t: t, lambda t: f"译:{t}"]  # first run: service down, text comes back as is
+        with TemporaryDirectory() as td, mock.patch.multiple(
+            send_email,
+            DATA_DIR=Path(td),
+            YOUTUBE_CHANNELS=channels,
+            YOUTUBE_FEED_URL=server.base + "/{channel_id}",
+            translate_many=lambda texts: {t: outcomes[0](t) for t in texts},
+        ):
+            first = send_email.fetch_youtube_channels()
+            outcomes.pop(0)
+            second = send_email.fetch_youtube_channels()
+        server.close()
+
+        self.assertIsNone(first[0]["title_zh"])
+        self.assertEqual(second[0]["title_zh"], "译:First video")
+        self.assertEqual(server.statuses, [200, 304])
+
+
+class MirrorHealthTests(unittest.TestCase):
+    def test_ranking_prefers_reliable_fast_mirrors_and_skips_cooldown(self):
+        now = 1_000_000.0
+        health = {}
+        for _ in range(send_email.MIRROR_FAILURE_LIMIT):
+            send_email.record_mirror_run(health, "dead", [(False, 8.0)] * 10, now)
+        send_email.record_mirror_run(health, "slow", [(True, 2.0)], now)
+        send_email.record_mirror_run(health, "fast", [(True, 0.2), (True, 0.2)], now)
+        send_email.record_mirror_run(health, "flaky", [(False, 8.0), (True, 3.0)], now)
+
+        self.assertEqual(health["dead"]["failures"], send_email.MIRROR_FAILURE_LIMIT)
+        self.assertEqual(health["flaky"]["failures"], 0)
+        self.assertEqual(send_email.rank_mirrors(health, ["dead", "flaky", "slow", "fast"], now), ["fast", "slow", "flaky"])
+        after_cooldown = now + send_email.MIRROR_COOLDOWN + 1
+        self.assertEqual(send_email.rank_mirrors(health, ["dead", "fast"], after_cooldown), ["fast", "dead"])
+        self.assertEqual(send_email.rank_mirrors(health, ["dead"], now), ["dead"])
+
+    def test_one_bad_run_does_not_start_a_cooldown(self):
+        health = {}
+        send_email.record_mirror_run(health, "m", [(False, 8.0)] * 10, 0.0)
+        self.assertEqual((health["m"]["failures"], health["m"]["cooldown_until"]), (1, 0))
+
+
+class FanOutTests(unittest.TestCase):
+    NEWS = [
+        {"site_id": "techurls", "title": "OpenAI ships agents", "title_zh": "OpenAI 发布智能体", "url": "https://a/1"},
+        {"site_id": "buzzing", "title": "Nvidia chip sales", "title_zh": "英伟达芯片销量", "url": "https://a/2"},
+        {"site_id": "techurls", "title": "Robot dog demo", "title_zh": "机器狗演示", "url": "https://a/3"},
+    ]
+
+    def config(self, sink):
+        return {"server": "127.0.0.1", "port": sink.port, "user": "radar@example.com", "password": "", "security": "none"}
+
+    def test_select_news_applies_site_and_keyword_filters(self):
+        select = send_email.select_news
+        self.assertEqual(len(select(self.NEWS, {"email": "a@x"})), 3)
+        self.assertEqual([i["url"] for i in select(self.NEWS, {"email": "a@x", "sites": ["techurls"]})], ["https://a/1", "https://a/3"])
+        self.assertEqual([i["url"] for i in select(self.NEWS, {"email": "a@x", "keywords": ["芯片"]})], ["https://a/2"])
+        self.assertEqual(len(select(self.NEWS, {"email": "a@x", "exclude_keywords": ["robot"], "max_items": 1})), 1)
+
+    def test_subscribers_with_no_matching_news_are_skipped_unless_opted_in(self):
+        subscribers = [
+            {"email": "chips@x", "keywords": ["芯片"]},
+            {"email": "none@x", "keywords": ["football"]},
+            {"email": "always@x", "keywords": ["football"], "send_empty": True},
+        ]
+        common = send_email.render_common_sections([], [])
+        messages, sizes, skipped = send_email.build_messages("radar@example.com", subscribers, self.NEWS, common)
+        self.assertEqual([m["To"] for m in messages], ["chips@x", "always@x"])
+        self.assertEqual(skipped, ["none@x"])
+        self.assertEqual(len(sizes), 2)
+        self.assertGreater(sizes[0], sizes[1])
+
+    def test_personalized_messages_share_a_few_connections(self):
+        subscribers = [{"email": f"user{i}@example.com", "keywords": ["chip"] if i % 2 else []} for i in range(30)]
+        common = send_email.render_common_sections([], [])
+        messages = [
+            send_email.compose_message("radar@example.com", sub["email"], *send_email.assemble_email(send_email.select_news(self.NEWS, sub), common))
+            for sub in subscribers
+        ]
+        with SmtpSink() as sink:
+            stats = send_email.deliver_all(messages, self.config(sink), pool_size=3)
+        self.assertEqual((stats["sent"], stats["failed"]), (30, 0))
+        self.assertLessEqual(sink.connections, 3)
+        self.assertEqual(sorted(r[0] for _, r, _ in sink.messages), sorted(s["email"] for s in subscribers))
+        raw = next(raw for _, r, raw in sink.messages if r == ["user1@example.com"])
+        plain = email.message_from_bytes(raw).get_payload(0).get_payload(decode=True).decode("utf-8")
+        self.assertNotIn("https://a/1", plain)
+        self.assertIn("https://a/2", plain)
+
+    def test_rejected_recipients_fail_alone_and_dropped_connections_reconnect(self):
+        messages = [send_email.compose_message("radar@example.com", f"user{i}@example.com", "<p>x</p>", "x") for i in range(6)]
+        with SmtpSink(reject={"user3@example.com"}, drop_after=2) as sink:
+            stats = send_email.deliver_all(messages, self.config(sink), pool_size=1)
+        self.assertEqual((stats["sent"], stats["failed"]), (5, 1))
+        self.assertIn("user3@example.com", stats["errors"][0])
+        self.assertGreater(stats["connections"], 1)
+
+    def test_login_failure_stops_the_pool_instead_of_retrying_per_message(self):
+        messages = [send_email.compose_message("radar@example.com", f"user{i}@example.com", "<p>x</p>", "x") for i in range(100)]
+        attempts = []
+
+        def bad_login(config):
+            attempts.append(config)
+            raise send_email.smtplib.SMTPAuthenticationError(535, b"bad credentials")
+
+        with mock.patch.object(send_email, "open_smtp", bad_login):
+            stats = send_email.deliver_all(messages, {"server": "x", "port": 25}, pool_size=3)
+        self.assertEqual((stats["sent"], stats["failed"], stats["connections"]), (0, 100, 0))
+        self.assertLessEqual(len(attempts), 3)
+
+    def test_empty_or_unknown_security_setting(self):
+        env = {"SMTP_SERVER": "smtp.example.com", "SENDER_EMAIL": "radar@example.com", "SMTP_PASSWORD": "pw"}
+        with mock.patch.dict(send_email.os.environ, {**env, "SMTP_SECURITY": ""}):
+            self.assertEqual(send_email.smtp_config()["security"], "auto")
+        with mock.patch.dict(send_email.os.environ, {**env, "SMTP_SECURITY": "tls"}):
+            self.assertIsNone(send_email.smtp_config())
+
+    def test_auto_falls_back_to_ssl_unless_the_login_was_refused(self):
+        config = {"server": "smtp.example.com", "port": 587, "user": "u", "password": "p", "security": "auto"}
+        smtplib = send_email.smtplib
+        with mock.patch.object(smtplib, "SMTP", side_effect=OSError("refused")), mock.patch.object(smtplib, "SMTP_SSL") as ssl_conn:
+            self.assertIs(send_email.open_smtp(config), ssl_conn.return_value)
+        self.assertEqual(ssl_conn.call_args[0][:2], ("smtp.example.com", 465))
+
+        starttls = mock.MagicMock()
+        starttls.login.side_effect = smtplib.SMTPAuthenticationError(535, b"bad credentials")
+        with mock.patch.object(smtplib, "SMTP", return_value=starttls), mock.patch.object(smtplib, "SMTP_SSL") as ssl_conn:
+            with self.assertRaises(smtplib.SMTPAuthenticationError):
+                send_email.open_smtp(config)
+        ssl_conn.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -111,7 +111,7 @@ class TopicFilterTests(unittest.TestCase):
                 "published_at": "2026-02-20T01:00:00Z",
             },
         ]
-        out = dedupe_items_by_title_url(items, random_pick=False)
+        out = dedupe_items_by_title_url(items)
         self.assertEqual(len(out), 1)
         self.assertEqual(out[0]["id"], "2")
 
@@ -0,0 +1,142 @@
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import requests
+
+from scripts.translation import (
+    STATS,
+    needs_translation,
+    open_title_cache,
+    save_title_cache,
+    title_cache_bucket,
+    translate_cached,
+    translate_titles,
+)
+from scripts.update_news import (
+    ZhTitleIndex,
+    add_bilingual_fields,
+    load_zh_title_index,
+    normalize_record,
+    save_zh_title_index,
+    update_zh_title_index,
+)
+from tests.stub_translate_server import StubTranslateServer
+
+
+class TranslationTests(unittest.TestCase):
+    def test_titles_are_translated_in_batches(self):
+        titles = [f"Agent release note {i}" for i in range(40)]
+        with StubTranslateServer() as stub, requests.Session() as session:
+            out = translate_titles(session, titles, workers=4, endpoint=stub.endpoint, rate=0)
+        self.assertEqual(out, {t: f"译:{t}" for t in titles})
+        self.assertEqual(len(stub.requests), 3)
+
+    def test_batch_with_wrong_line_count_falls_back_to_single_titles(self):
+        titles = ["First title", "Second\ntitle", "Third title"]
+        with StubTranslateServer(merge_lines=True) as stub, requests.Session() as session:
+            out = translate_titles(session, titles, endpoint=stub.endpoint, rate=0)
+        self.assertEqual(out["First title"], "译:First title")
+        self.assertEqual(out["Second\ntitle"], "译:Second title")
+        self.assertEqual(len(stub.requests), 4)
+
+    def test_failed_batch_request_is_not_retried_per_title(self):
+        titles = ["First title", "Second title", "Third title"]
+        with StubTranslateServer(fail=True) as stub, requests.Session() as session:
+            out = translate_titles(session, titles, endpoint=stub.endpoint, rate=0)
+        self.assertEqual(out, {})
+        self.assertEqual(len(stub.requests), 1)
+
+    def test_budget_goes_to_popular_then_newest_titles(self):
+        items = [
+            {"id": "old-popular", "title": "Chip export rules tighten", "url": "https://a.example/1", "event_ts": 100.0},
+            {"id": "new", "title": "New agent framework ships", "url": "https://a.example/2", "event_ts": 300.0},
+            {"id": "older", "title": "Benchmark results posted", "url": "https://a.example/3", "event_ts": 200.0},
+        ]
+        with StubTranslateServer() as stub, requests.Session() as session:
+            _, _, cache = add_bilingual_fields(
+                items, items, session, {}, 2, popularity={"old-popular": 3}, endpoint=stub.endpoint, rate=0
+            )
+        self.assertEqual(set(cache), {"Chip export rules tighten", "New agent framework ships"})
+
+    def test_only_text_that_is_not_mostly_chinese_is_sent(self):
+        self.assertTrue(needs_translation("OpenAI ships agents"))
+        self.assertTrue(needs_translation("OpenAI ships agents 智能"))
+        self.assertFalse(needs_translation("OpenAI 发布智能体"))
+        self.assertFalse(needs_translation(""))
+
+
+class TitleCacheTests(unittest.TestCase):
+    def test_migrates_legacy_json_and_rewrites_only_changed_buckets(self):
+        titles = [f"Title {i}" for i in range(200)]
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            legacy = root / "title-zh-cache.json"
+            legacy.write_text(json.dumps({t: f"标题 {t}" for t in titles}, ensure_ascii=False), encoding="utf-8")
+            cache = open_title_cache(root / "title-zh-cache", "2026-02-20", legacy)
+            self.assertFalse(legacy.exists())
+
+            cache = open_title_cache(root / "title-zh-cache", "2026-02-20", legacy)
+            self.assertEqual(cache.get("Title 7"), "标题 Title 7")
+            self.assertEqual(list(cache.buckets), [title_cache_bucket("Title 7")])
+            cache["Fresh title"] = "新标题"
+            self.assertEqual(cache.dirty, {title_cache_bucket("Fresh title")})
+            self.assertEqual(save_title_cache(cache), 1)
+
+            reopened = open_title_cache(root / "title-zh-cache", "2026-02-20")
+            self.assertEqual(reopened.get("Fresh title"), "新标题")
+            self.assertNotIn("Unknown title", reopened)
+
+    def test_entries_unused_past_max_age_are_evicted(self):
+        bucket = title_cache_bucket("Old title")
+        neighbour = next(f"Title {i}" for i in range(10000) if title_cache_bucket(f"Title {i}") == bucket)
+        with TemporaryDirectory() as td:
+            root = Path(td) / "title-zh-cache"
+            cache = open_title_cache(root, "2026-01-01")
+            cache["Old title"] = "旧标题"
+            save_title_cache(cache)
+
+            later = open_title_cache(root, "2026-06-01")
+            later[neighbour] = "邻近标题"
+            save_title_cache(later)
+            reopened = open_title_cache(root, "2026-06-01")
+            self.assertNotIn("Old title", reopened)
+            self.assertIn(neighbour, reopened)
+
+    def test_cached_titles_skip_the_network_and_are_counted(self):
+        cache = {"Cached title": "缓存标题"}
+        hits, misses = STATS.hits, STATS.misses
+        with StubTranslateServer() as stub, requests.Session() as session:
+            out = translate_cached(session, ["Cached title", "New title", "New title"], cache, endpoint=stub.endpoint, rate=0)
+        self.assertEqual(out, {"Cached title": "缓存标题", "New title": "译:New title"})
+        self.assertEqual(stub.requests, ["New title"])
+        self.assertEqual(cache["New title"], "译:New title")
+        self.assertEqual((STATS.hits - hits, STATS.misses - misses), (1, 1))
+
+
+class ZhTitleIndexTests(unittest.TestCase):
+    def test_chinese_title_seen_earlier_replaces_translation(self):
+        earlier = normalize_record(
+            {"id": "zh1", "site_id": "buzzing", "source": "Buzzing", "title": "英伟达发布新芯片", "url": "https://example.com/chip"}
+        )
+        index = ZhTitleIndex(titles={})
+        self.assertEqual(update_zh_title_index(index, [earlier]), 1)
+        with TemporaryDirectory() as td:
+            path = Path(td) / "zh-title-index.json.gz"
+            save_zh_title_index(path, index, {"zh1": "2026-02-19"})
+            reloaded = load_zh_title_index(path)
+            save_zh_title_index(path, load_zh_title_index(path), {})
+            self.assertEqual(load_zh_title_index(path).titles, {})
+
+        item = {"id": "en1", "title": "Nvidia unveils new chip", "url": "https://example.com/chip", "event_ts": 1.0}
+        hits = STATS.url_index_hits
+        with StubTranslateServer() as stub, requests.Session() as session:
+            ai, _, _ = add_bilingual_fields([item], [item], session, {}, 10, zh_index=reloaded, endpoint=stub.endpoint)
+        self.assertEqual(ai[0]["title_zh"], "英伟达发布新芯片")
+        self.assertEqual(stub.requests, [])
+        self.assertEqual(STATS.url_index_hits - hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
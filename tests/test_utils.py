@@ -1,9 +1,27 @@
+import json
 import unittest
-from datetime import datetime, timezone
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from unittest import mock
 
-from scripts.update_news import make_item_id, normalize_url, parse_date_any, parse_opml_subscriptions, parse_relative_time_zh
+from scripts import update_news
+from scripts.update_news import (
+    attach_epoch_fields,
+    canonicalize_url,
+    check_freshness,
+    event_ts,
+    make_item_id,
+    merge_source_statuses,
+    normalize_url,
+    parse_date_any,
+    parse_opml_subscriptions,
+    parse_relative_time_zh,
+    public_record,
+    record_url,
+    write_json_if_changed,
+)
 
 
 class UtilsTests(unittest.TestCase):
@@ -41,6 +59,90 @@ class UtilsTests(unittest.TestCase):
         self.assertEqual(feeds[0]["title"], "A")
         self.assertEqual(feeds[1]["title"], "B")
 
+    def test_attach_epoch_fields_event_time(self):
+        rec = attach_epoch_fields(
+            {"site_id": "techurls", "published_at": None, "first_seen_at": "2026-02-20T01:00:00Z", "last_seen_at": "2026-02-20T02:00:00Z"}
+        )
+        self.assertEqual(rec["event_ts"], datetime(2026, 2, 20, 1, 0, tzinfo=timezone.utc).timestamp())
+        self.assertEqual(rec["last_seen_ts"], datetime(2026, 2, 20, 2, 0, tzinfo=timezone.utc).timestamp())
+        self.assertEqual(set(public_record(rec)), {"site_id", "published_at", "first_seen_at"})
+
+    def test_event_ts_rss_ignores_first_seen(self):
+        rec = {"site_id": "opmlrss", "published_at": None, "first_seen_at": "2026-02-20T01:00:00Z"}
+        self.assertIsNone(event_ts(rec))
+        self.assertNotIn("event_ts", rec)
+
+    def test_write_json_if_changed_ignores_generated_at(self):
+        with TemporaryDirectory() as td:
+            p = Path(td) / "out.json"
+            self.assertTrue(write_json_if_changed(p, {"generated_at": "a", "items": [1]}))
+            self.assertFalse(write_json_if_changed(p, {"generated_at": "b", "items": [1]}))
+            self.assertEqual(json.loads(p.read_text(encoding="utf-8"))["generated_at"], "a")
+            self.assertTrue(write_json_if_changed(p, {"generated_at": "c", "items": [2]}))
+            self.assertEqual([x.name for x in Path(td).iterdir()], ["out.json"])
+
+
+class UrlMemoTests(unittest.TestCase):
+    RAW = [
+        "https://Example.com/a/?utm_source=x&id=1#top",
+        "https://example.com/b?fbclid=abc",
+        "HTTPS://EXAMPLE.COM/c/",
+        "example.com/no-scheme ",
+    ]
+
+    def setUp(self):
+        patcher = mock.patch.multiple(update_news, URL_MEMO=OrderedDict(), URL_MEMO_SIZE=5)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_memo_hits_match_canonicalize_url(self):
+        first = [normalize_url(u) for u in self.RAW]
+        with mock.patch.object(update_news, "canonicalize_url", side_effect=AssertionError("memo miss")):
+            self.assertEqual([normalize_url(u) for u in self.RAW[-2:]], first[-2:])
+            self.assertEqual(normalize_url(first[-1]), first[-1])
+        self.assertEqual(first, [canonicalize_url(u) for u in self.RAW])
+
+    def test_oldest_entries_are_evicted_at_the_size_limit(self):
+        for u in self.RAW:
+            normalize_url(u)
+            self.assertLessEqual(len(update_news.URL_MEMO), update_news.URL_MEMO_SIZE)
+        self.assertNotIn(self.RAW[0], update_news.URL_MEMO)
+        self.assertIn(self.RAW[-1], update_news.URL_MEMO)
+
+    def test_record_url_prefers_the_canonical_url_stored_at_ingest(self):
+        stored = {"url": "https://example.com/kept?utm_source=x", "host": "example.com"}
+        with mock.patch.object(update_news, "canonicalize_url", side_effect=AssertionError("recomputed")):
+            self.assertEqual(record_url(stored), stored["url"])
+        self.assertEqual(record_url({"url": "https://Example.com/x/?utm_source=y"}), "https://example.com/x")
+
+
+class FreshnessTests(unittest.TestCase):
+    now = datetime(2026, 2, 20, 12, 0, tzinfo=timezone.utc)
+
+    def status(self, minutes_ago, ok_flags):
+        return {
+            "generated_at": (self.now - timedelta(minutes=minutes_ago)).isoformat(),
+            "sites": [{"site_id": f"s{i}", "ok": ok} for i, ok in enumerate(ok_flags)],
+        }
+
+    def test_gate_uses_newest_stamp_and_source_health(self):
+        with TemporaryDirectory() as td:
+            latest = Path(td) / "latest-24h.json"
+            latest.write_text(json.dumps({"generated_at": "2026-02-20T09:00:00Z", "items": []}, indent=2), encoding="utf-8")
+            self.assertFalse(check_freshness(latest, None, self.now, 60, 0.8)[0])
+            self.assertTrue(check_freshness(latest, None, self.now, 240, 0.8)[0])
+            # latest-24h.json is not rewritten when unchanged, so a newer status counts
+            self.assertTrue(check_freshness(latest, self.status(10, [True] * 5), self.now, 60, 0.8)[0])
+            fresh, reason = check_freshness(latest, self.status(10, [True, True, False, False]), self.now, 60, 0.8)
+            self.assertFalse(fresh)
+            self.assertIn("50%", reason)
+            self.assertFalse(check_freshness(Path(td) / "missing.json", None, self.now, 60, 0.8)[0])
+
+    def test_refreshed_statuses_replace_previous_ones_in_place(self):
+        previous = [{"site_id": "a", "ok": True}, {"site_id": "b", "ok": False}, {"site_id": "c", "ok": False}]
+        merged = merge_source_statuses(previous, [{"site_id": "c", "ok": True}, {"site_id": "d", "ok": True}])
+        self.assertEqual([(s["site_id"], s["ok"]) for s in merged], [("a", True), ("b", False), ("c", True), ("d", True)])
+
 
 if __name__ == "__main__":
     unittest.main()